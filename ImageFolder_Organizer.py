@@ -1,54 +1,70 @@
 import os
 import shutil
 
+from image_scanner import count_images, scan_images
+
+SCAN_OPTIONS = {
+    "extensions": (".jpg", ".jpeg", ".png", ".gif", ".bmp"),
+    "recursive": False,
+}
+
 
 def divide_images_into_batches(folder_path, num_batches):
     """
     Divides images in the given folder into multiple batches.
 
+    Images are streamed from the folder rather than listed and sorted first,
+    so each batch gets the next images in directory order.
+
     Args:
         folder_path (str): Path to the folder containing images.
         num_batches (int): Number of batches to divide the images into.
     """
     try:
-        # Get a list of all image files in the folder
-        image_files = [
-            f
-            for f in os.listdir(folder_path)
-            if f.lower().endswith((".jpg", ".jpeg", ".png", ".gif", ".bmp"))
-        ]
-
-        # Sort the image files to ensure consistent ordering
-        image_files.sort()
-
-        # Calculate the number of images per batch
-        total_images = len(image_files)
+        # Only the top level is batched, so earlier Batch folders are left alone.
+        # Counting first lets the batches be balanced without keeping a list.
+        total_images = count_images(folder_path, **SCAN_OPTIONS)
         images_per_batch = total_images // num_batches
         remainder = total_images % num_batches
 
         print(f"Total images: {total_images}")
         print(f"Images per batch: {images_per_batch}, Remainder: {remainder}")
 
-        # Create the batches
-        start_index = 0
-        for batch_num in range(1, num_batches + 1):
-            batch_folder = os.path.join(folder_path, f"Batch{batch_num}")
-            os.makedirs(batch_folder, exist_ok=True)
-
-            # Determine the range of images for this batch
-            end_index = (
-                start_index + images_per_batch + (1 if batch_num <= remainder else 0)
-            )
-            batch_files = image_files[start_index:end_index]
+        # Batch sizes in order; each batch gets one extra image until the
+        # remainder is used up
+        batch_sizes = [
+            images_per_batch + (1 if batch_num <= remainder else 0)
+            for batch_num in range(1, num_batches + 1)
+        ]
 
-            # Move images to the batch folder
-            for file_name in batch_files:
-                source_path = os.path.join(folder_path, file_name)
-                destination_path = os.path.join(batch_folder, file_name)
-                shutil.move(source_path, destination_path)
+        # Move images into the batch folders in the order they are found
+        batch_num = 1
+        batch_count = 0
+        batch_folder = None
+        for source_path in scan_images(folder_path, **SCAN_OPTIONS):
+            while (
+                batch_num <= num_batches and batch_count == batch_sizes[batch_num - 1]
+            ):
+                print(f"Batch{batch_num} created with {batch_count} images.")
+                batch_num += 1
+                batch_count = 0
+                batch_folder = None
+            if batch_num > num_batches:
+                break
+            if batch_folder is None:
+                batch_folder = os.path.join(folder_path, f"Batch{batch_num}")
+                os.makedirs(batch_folder, exist_ok=True)
+            destination_path = os.path.join(batch_folder, os.path.basename(source_path))
+            shutil.move(source_path, destination_path)
+            batch_count += 1
 
-            print(f"Batch{batch_num} created with {len(batch_files)} images.")
-            start_index = end_index
+        # Report the last batch and create any folders left empty
+        for remaining_num in range(batch_num, num_batches + 1):
+            os.makedirs(
+                os.path.join(folder_path, f"Batch{remaining_num}"), exist_ok=True
+            )
+            count = batch_count if remaining_num == batch_num else 0
+            print(f"Batch{remaining_num} created with {count} images.")
 
         print("All batches created successfully.")
 
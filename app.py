@@ -1,18 +1,20 @@
+import atexit
 import os
 from flask import Flask, request, render_template, jsonify, send_from_directory
 import easyocr
-from googletrans import Translator
-from transformers import (
-    BlipProcessor,
-    BlipForConditionalGeneration,
-    AutoTokenizer,
-    AutoModelForSequenceClassification,
-)
-from PIL import Image
 from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
 import torch
 import random
 
+import devices
+import model_registry
+from caption_engine import CAPTION_PROFILES, DEFAULT_CAPTION_PROFILE, CaptionEngine
+from image_decode import decode_image
+from ocr_engine import readtext_rgb
+from ocr_filter import OcrFilter, load_blocklist
+from result_cache import ResultCache, image_hash
+from translation import TranslationService, get_backend
+
 app = Flask(__name__)
 
 # Create an "uploads" directory if not exists
@@ -20,14 +22,31 @@ UPLOAD_FOLDER = "uploads"
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 app.config["UPLOAD_FOLDER"] = UPLOAD_FOLDER
 
+# CUDA when available, otherwise the CPU; set QUANTIZE_ON_CPU to run BLIP and
+# the ideology classifier as int8 models on CPU-only machines
+DEVICE = devices.pick_device()
+QUANTIZE_ON_CPU = False
+USE_INT8 = QUANTIZE_ON_CPU and DEVICE == "cpu"
+
 # Initialize sentiment analysis models
 analyzer = SentimentIntensityAnalyzer()
-reader = easyocr.Reader(["en", "tl"], gpu=True)
-translator = Translator()
-processor = BlipProcessor.from_pretrained("Salesforce/blip-image-captioning-base")
-model = BlipForConditionalGeneration.from_pretrained(
-    "Salesforce/blip-image-captioning-base"
-).to("cuda")
+reader = easyocr.Reader(["en", "tl"], gpu=DEVICE == "cuda")
+# Same box filtering as the folder pipeline (see ocr_filter.py)
+ocr_filter = OcrFilter(min_confidence=0.2, min_height=8, blocklist=load_blocklist())
+# "google" for the web service, "marian" for the local tl->en model
+TRANSLATION_BACKEND = "google"
+translation_service = TranslationService(get_backend(TRANSLATION_BACKEND))
+# "torch" for eager BLIP, "onnx" for the CPU graphs written by
+# `python blip_onnx.py export`
+CAPTION_BACKEND = "torch"
+# Concurrent requests share BLIP batches through the caption engine
+caption_engine = CaptionEngine(
+    device=DEVICE,
+    max_batch_size=8,
+    max_wait=0.02,
+    quantized=USE_INT8,
+    backend=CAPTION_BACKEND,
+)
 
 # Political Ideology & Affiliation Integration
 IDEOLOGY_TO_AFFILIATION = {
@@ -44,9 +63,8 @@ IDEOLOGY_TO_AFFILIATION = {
 
 # Load Political Ideology Model
 MODEL_NAME = "fine_tuned_model_for_PoliticalIdeology"
-tokenizer = AutoTokenizer.from_pretrained(MODEL_NAME)
-ideology_model = AutoModelForSequenceClassification.from_pretrained(MODEL_NAME).to(
-    "cuda"
+ideology_classifier = model_registry.get_ideology_classifier(
+    MODEL_NAME, DEVICE, quantized=USE_INT8
 )
 
 IDEOLOGY_LABELS = {
@@ -61,28 +79,29 @@ IDEOLOGY_LABELS = {
     8: "Liberalism",
 }
 
+# Change this whenever the models or settings behind the results change
+RESULT_CACHE_VERSION = (
+    f"web|blip-base-{CAPTION_BACKEND}|easyocr-en-tl|{ocr_filter.version()}|{TRANSLATION_BACKEND}"
+    f"|{MODEL_NAME}"
+    f"{'|int8' if USE_INT8 else ''}|v1"
+)
+result_cache = ResultCache(version=RESULT_CACHE_VERSION)
+# The cache commits in batches; keep the last one when the server stops
+atexit.register(result_cache.close)
+
 
 # Functions for Sentiment Analysis
-def extract_text(image_path):
-    result = reader.readtext(image_path)
+def extract_text(image):
+    result = ocr_filter.apply(readtext_rgb(reader, image))
     return " ".join([item[1] for item in result]) if result else ""
 
 
 def translate_text(text):
-    if not text.strip():
-        return ""
-    try:
-        return translator.translate(text, dest="en").text
-    except Exception:
-        return text
+    return translation_service.translate(text, "en")
 
 
-def generate_caption(image_path):
-    image = Image.open(image_path)
-    inputs = processor(images=image, return_tensors="pt").to("cuda")
-    with torch.no_grad():
-        out = model.generate(**inputs)
-    return processor.decode(out[0], skip_special_tokens=True)
+def generate_caption(image, profile=DEFAULT_CAPTION_PROFILE):
+    return caption_engine.caption(image, profile)
 
 
 def analyze_sentiment(text):
@@ -100,11 +119,12 @@ def analyze_sentiment(text):
 def predict_ideology(text):
     if not text.strip():
         return "Unclassified"
-    inputs = tokenizer(text, return_tensors="pt", truncation=True, padding=True).to(
-        "cuda"
-    )
-    with torch.no_grad():
-        outputs = ideology_model(**inputs)
+    with ideology_classifier as (tokenizer, ideology_model):
+        inputs = tokenizer(text, return_tensors="pt", truncation=True, padding=True).to(
+            DEVICE
+        )
+        with torch.no_grad():
+            outputs = ideology_model(**inputs)
     predictions = torch.argmax(outputs.logits, dim=1).item()
     return IDEOLOGY_LABELS.get(predictions, "Unclassified")
 
@@ -118,6 +138,39 @@ def map_affiliation(ideology):
     return random.choice(IDEOLOGY_TO_AFFILIATION.get(ideology, ["Unclassified"]))
 
 
+def analyze_image(image, caption_profile=DEFAULT_CAPTION_PROFILE):
+    # Sentiment Analysis; OCR and BLIP share the one decoded RGB array
+    extracted_text = extract_text(image)
+    translated_text = translate_text(extracted_text)
+    image_caption = generate_caption(image, caption_profile)
+    text_sentiment = analyze_sentiment(translated_text)
+    caption_sentiment = analyze_sentiment(image_caption)
+
+    # Overall Sentiment Calculation
+    overall_score = text_sentiment["score"] + caption_sentiment["score"]
+    overall_sentiment = (
+        "Positive"
+        if overall_score >= 0.05
+        else "Negative" if overall_score <= -0.05 else "Neutral"
+    )
+
+    # Political Ideology & Affiliation Prediction
+    ideology = predict_ideology(translated_text + " " + image_caption)
+    affiliation = map_affiliation(ideology)
+
+    return {
+        "extracted_text": extracted_text,
+        "translated_text": translated_text,
+        "image_caption": image_caption,
+        "caption_profile": caption_profile,
+        "text_sentiment": text_sentiment["sentiment"],
+        "caption_sentiment": caption_sentiment["sentiment"],
+        "overall_sentiment": overall_sentiment,
+        "predicted_ideology": ideology,
+        "political_affiliation": affiliation,
+    }
+
+
 # Main Route
 @app.route("/", methods=["GET", "POST"])
 def index():
@@ -129,42 +182,27 @@ def index():
         if image.filename == "":
             return jsonify({"error": "No selected file"})
 
+        # The upload is read into memory once; the saved copy is only served back
+        data = image.read()
         image_path = os.path.join(app.config["UPLOAD_FOLDER"], image.filename)
-        image.save(image_path)
-
-        # Sentiment Analysis
-        extracted_text = extract_text(image_path)
-        translated_text = translate_text(extracted_text)
-        image_caption = generate_caption(image_path)
-        text_sentiment = analyze_sentiment(translated_text)
-        caption_sentiment = analyze_sentiment(image_caption)
-
-        # Overall Sentiment Calculation
-        overall_score = text_sentiment["score"] + caption_sentiment["score"]
-        overall_sentiment = (
-            "Positive"
-            if overall_score >= 0.05
-            else "Negative" if overall_score <= -0.05 else "Neutral"
-        )
-
-        # Political Ideology & Affiliation Prediction
-        ideology = predict_ideology(translated_text + " " + image_caption)
-        affiliation = map_affiliation(ideology)
+        with open(image_path, "wb") as file:
+            file.write(data)
+
+        caption_profile = request.form.get("caption_profile", DEFAULT_CAPTION_PROFILE)
+        if caption_profile not in CAPTION_PROFILES:
+            return jsonify({"error": f"Unknown caption profile '{caption_profile}'"})
+
+        # Identical uploads are answered from the result cache
+        key = f"{image_hash(data)}|{caption_profile}"
+        analysis = result_cache.get(key)
+        if analysis is None:
+            analysis = analyze_image(decode_image(data), caption_profile)
+            # Untranslated fallbacks are answered but not cached
+            if not translation_service.last_failed():
+                result_cache.put(key, analysis)
 
         # Response
-        return jsonify(
-            {
-                "image_url": f"/uploads/{image.filename}",
-                "extracted_text": extracted_text,
-                "translated_text": translated_text,
-                "image_caption": image_caption,
-                "text_sentiment": text_sentiment["sentiment"],
-                "caption_sentiment": caption_sentiment["sentiment"],
-                "overall_sentiment": overall_sentiment,
-                "predicted_ideology": ideology,
-                "political_affiliation": affiliation,
-            }
-        )
+        return jsonify({"image_url": f"/uploads/{image.filename}", **analysis})
 
     return render_template("index.html")
 
@@ -1,64 +1,146 @@
+import argparse
 import os
-import easyocr
-from googletrans import Translator
-from transformers import BlipProcessor, BlipForConditionalGeneration
-from PIL import Image
-from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
-import pandas as pd
-from openpyxl import Workbook, load_workbook
-from openpyxl.utils.dataframe import dataframe_to_rows
-from openpyxl.styles import Alignment
-import matplotlib.pyplot as plt
-import torch
-from torch.cuda.amp import autocast
-from concurrent.futures import ThreadPoolExecutor, as_completed
 from tqdm import tqdm
-import time
 
-# Initialize the VADER sentiment analyzer
-analyzer = SentimentIntensityAnalyzer()
+import devices
+import model_registry
+from batch_scheduler import BatchScheduler
+from caption_engine import CAPTION_PROFILES, DEFAULT_CAPTION_PROFILE, CaptionEngine
+from image_decode import decode_image
+from image_scanner import scan_images
+from near_duplicates import NearDuplicateClusters
+from ocr_engine import OcrEngine
+from ocr_filter import OcrFilter, load_blocklist
+from ocr_pool import OcrPool
+from ocr_preprocess import get_profile
+from ocr_store import OcrStore
+from pipeline import Pipeline, Stage
+from progress_journal import ProgressJournal
+from result_cache import ResultCache, image_hash
+from results_sink import ResultsSink
+from text_presence import TextPresenceDetector
+from sentiment_batch import polarity_scores
+from tracing import Tracer
+from translation import TranslationService, get_backend
+
+# CUDA when available, otherwise the CPU; set QUANTIZE_ON_CPU to caption with
+# the int8 BLIP model on CPU-only machines
+DEVICE = devices.pick_device()
+QUANTIZE_ON_CPU = False
+USE_INT8 = QUANTIZE_ON_CPU and DEVICE == "cpu"
+
+# "google" for the web service, "marian" for the local tl->en model,
+# "offline" for the glossary stand-in used in benchmarks
+TRANSLATION_BACKEND = "google"
+translation_service = TranslationService(
+    get_backend(TRANSLATION_BACKEND), max_batch_size=32, max_concurrency=4
+)
+
+# How images are rescaled before OCR: "original", "balanced" or "fast"
+OCR_PROFILE = "balanced"
+ocr_profile = get_profile(OCR_PROFILE)
+
+# Boxes dropped before their text is translated and scored: low confidence,
+# too small, or a watermark from `python ocr_filter.py learn`
+ocr_filter = OcrFilter(min_confidence=0.2, min_height=8, blocklist=load_blocklist())
+
+# Raw OCR boxes and confidences per image hash, so Extracted Text can be
+# re-derived with `python ocr_store.py text` instead of running OCR again
+ocr_store = OcrStore(version=f"easyocr-en-tl-{OCR_PROFILE}")
+
+# Skip OCR on images the edge-density check finds no text in. Off by default,
+# since skipped images lose any text the check misses; turn it on once
+# `python -m benchmarks.text_presence_benchmark` shows an acceptable miss
+# rate on your corpus
+SKIP_TEXTLESS_IMAGES = False
+text_detector = TextPresenceDetector() if SKIP_TEXTLESS_IMAGES else None
+
+# "torch" for eager BLIP, "onnx" for the CPU graphs written by
+# `python blip_onnx.py export`
+CAPTION_BACKEND = "torch"
+
+# Change this whenever the models or settings behind the results change
+RESULT_CACHE_VERSION = (
+    f"blip-base{'-int8' if USE_INT8 else ''}-{CAPTION_BACKEND}"
+    f"|easyocr-en-tl-{OCR_PROFILE}"
+    f"{'-textcheck' if SKIP_TEXTLESS_IMAGES else ''}|{ocr_filter.version()}"
+    f"|{TRANSLATION_BACKEND}|v2"
+)
+result_cache = ResultCache(version=RESULT_CACHE_VERSION)
+
+# On the CPU, OCR runs in worker processes with one EasyOCR reader each; on
+# the GPU a single in-process reader is shared instead. The CPU cores are
+# split so torch never runs more threads than there are cores: MAIN_THREADS
+# for BLIP in this process, the rest evenly across the OCR workers.
+CPU_CORES = os.cpu_count() or 2
+MAIN_THREADS = max(1, CPU_CORES // 2)
+OCR_PROCESSES = max(1, (CPU_CORES - MAIN_THREADS) // 2) if DEVICE == "cpu" else 0
+ocr_pool = (
+    OcrPool(
+        workers=OCR_PROCESSES,
+        threads_per_worker=max(1, (CPU_CORES - MAIN_THREADS) // OCR_PROCESSES),
+    )
+    if OCR_PROCESSES
+    else None
+)
+if ocr_pool is not None:
+    devices.set_threads(MAIN_THREADS)
+# Size of EasyOCR's recognition batches (text crops per forward pass); the
+# OCR engine pools the crops of many images, so it can fill larger ones
+ocr_scheduler = BatchScheduler(
+    "OCR", DEVICE, max_batch_size=16 if ocr_pool is not None else 64
+)
+# Without worker processes, the text crops of images OCRed at the same time
+# are pooled into shared recognizer batches
+ocr_engine = (
+    OcrEngine(gpu=DEVICE == "cuda", scheduler=ocr_scheduler, max_images=16)
+    if ocr_pool is None
+    else None
+)
+
+# "fast", "balanced" or "beam" (see caption_engine.CAPTION_PROFILES);
+# --caption-profile overrides it for one run
+CAPTION_PROFILE = DEFAULT_CAPTION_PROFILE
+
+# Captions from all worker threads are batched through one BLIP engine
+caption_engine = CaptionEngine(
+    device=DEVICE,
+    max_batch_size=8,
+    max_wait=0.05,
+    quantized=USE_INT8,
+    backend=CAPTION_BACKEND,
+)
+
+
+def read_text_boxes(image):
+    """EasyOCR's (box, text, confidence) results for an image path or RGB array"""
+    if ocr_pool is not None:
+        return ocr_scheduler.call(
+            lambda batch_size: ocr_pool.readtext(image, batch_size=batch_size)
+        )
+    return ocr_engine.readtext(image)
 
 
-def extract_text_with_easyocr(image_path):
-    """Extract text from an image using EasyOCR"""
-    reader = easyocr.Reader(["en", "tl"], gpu=True)
-    result = reader.readtext(image_path)
+def extract_text_with_easyocr(image, scale=1.0):
+    """Extract text from an image path or RGB array resized by `scale` for OCR"""
+    result = ocr_filter.apply(read_text_boxes(image), scale)
     extracted_text = " ".join([item[1] for item in result])
     return extracted_text
 
 
 def translate_text(text, target_language="en"):
-    """Translates extracted text to the target language"""
-    if not text.strip():
-        return ""
-    try:
-        translator = Translator()
-        translated = translator.translate(text, dest=target_language)
-        return translated.text
-    except Exception as e:
-        print(f"Error during translation: {e}")
-        return text
+    """Translates the non-English sentences of the extracted text"""
+    return translation_service.translate_mixed(text, target_language)
 
 
-def generate_caption(image_path):
-    """Generate a caption using BLIP"""
-    processor = BlipProcessor.from_pretrained("Salesforce/blip-image-captioning-base")
-    model = BlipForConditionalGeneration.from_pretrained(
-        "Salesforce/blip-image-captioning-base"
-    ).to("cuda")
-
-    image = Image.open(image_path)
-    inputs = processor(images=image, return_tensors="pt").to("cuda")
-    with torch.amp.autocast("cuda"):
-        out = model.generate(**inputs)
-    caption = processor.decode(out[0], skip_special_tokens=True)
-    return caption
+def generate_caption(image):
+    """Generate a caption using BLIP, batched with other in-flight images"""
+    return caption_engine.caption(image, CAPTION_PROFILE)
 
 
 def analyze_sentiment(text):
     """Analyze sentiment using VADER"""
-    sentiment = analyzer.polarity_scores(text)
-    compound_score = sentiment["compound"]
+    neg, neu, pos, compound_score = polarity_scores(text)
 
     if compound_score >= 0.05:
         sentiment_label = "Positive"
@@ -67,13 +149,7 @@ def analyze_sentiment(text):
     else:
         sentiment_label = "Neutral"
 
-    return (
-        sentiment_label,
-        sentiment["neg"],
-        sentiment["neu"],
-        sentiment["pos"],
-        compound_score,
-    )
+    return (sentiment_label, neg, neu, pos, compound_score)
 
 
 def calculate_confidence(overall_score):
@@ -87,148 +163,366 @@ def calculate_confidence(overall_score):
     return round(confidence, 2)
 
 
+def results_excel_file(output_folder):
+    """Path of the results workbook inside the output folder"""
+    return os.path.join(output_folder, "Sentiment_Analysis_Results.xlsx")
+
+
 def create_or_load_excel(output_folder, results):
-    """Create or load the Excel file and append new results"""
-    excel_file = os.path.join(output_folder, "Sentiment_Analysis_Results.xlsx")
+    """Append a DataFrame of results and rebuild the Excel file"""
+    sink = ResultsSink(results_excel_file(output_folder), columns=results.columns)
+    for row in results.to_dict("records"):
+        sink.append(row)
+    sink.close()
+
+
+# Workers and executor type for each stage of the folder pipeline
+STAGE_CONFIG = {
+    "decode": {"workers": 2, "executor": "thread"},
+    # One thread per OCR process keeps every worker process busy; without
+    # processes, enough threads to fill the OCR engine's pools
+    "ocr": {"workers": OCR_PROCESSES or 16, "executor": "thread"},
+    "translate": {"workers": 8, "executor": "thread"},
+    "caption": {"workers": 8, "executor": "thread"},
+    "score": {"workers": 1, "executor": "thread"},
+}
+PIPELINE_QUEUE_SIZE = 32
+
+# Files picked up from the folder tree (their leading bytes are checked too)
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png")
+
+# At most this many finished images are lost if a folder run crashes
+FLUSH_EVERY = 50
+
+# Model calls an image needs when it is analysed: EasyOCR and BLIP
+INFERENCE_CALLS_PER_IMAGE = 2
+
+
+def result_key(record):
+    """Result cache key: the same image captioned with another profile differs"""
+    return f"{record['hash']}|{CAPTION_PROFILE}"
+
+
+def decode_stage(record):
+    """Read the image once, look it up in the result cache and decode it to RGB"""
+    with open(record["path"], "rb") as file:
+        data = file.read()
+    record["hash"] = image_hash(data)
+    cached = result_cache.get(result_key(record))
+    if cached is not None:
+        cached["File Name"] = os.path.basename(record["path"])
+        record["result"] = cached
+        return record
+    # OCR and captioning both read this one array instead of the file
+    record["image"] = decode_image(data)
+    return record
+
+
+def ocr_stage(record):
+    """Rescale the image with the OCR profile and extract its text"""
+    if text_detector is not None and not text_detector.has_text(record["image"]):
+        # No OCR scale is recorded, since the reader never saw the image
+        record["ocr_scale"] = None
+        record["extracted_text"] = ""
+        return record
+    image, record["ocr_scale"] = ocr_profile.prepare(record["image"])
+    result = read_text_boxes(image)
+    ocr_store.add(
+        record["hash"], os.path.basename(record["path"]), result, record["ocr_scale"]
+    )
+    # The store keeps every box, so the filter can be changed later
+    kept = ocr_filter.apply(result, record["ocr_scale"])
+    record["extracted_text"] = " ".join([item[1] for item in kept])
+    return record
 
-    # Sort results by file name
-    results = results.sort_values(by="File Name")
 
-    while True:
-        try:
-            if os.path.exists(excel_file):
-                workbook = load_workbook(excel_file)
-                sheet = workbook.active
-            else:
-                workbook = Workbook()
-                sheet = workbook.active
-                sheet.title = "Sentiment Analysis Results"
-                sheet.append(results.columns.tolist())
-
-            for row in dataframe_to_rows(results, index=False, header=False):
-                sheet.append(row)
-
-            # Autofit column widths and align cells
-            for column in sheet.columns:
-                max_length = 0
-                column_letter = column[0].column_letter  # Get column letter
-                for cell in column:
-                    try:
-                        if cell.value:
-                            max_length = max(max_length, len(str(cell.value)))
-                    except:
-                        pass
-                adjusted_width = max_length + 2
-                sheet.column_dimensions[column_letter].width = adjusted_width
-                for cell in column:
-                    cell.alignment = Alignment(wrap_text=True, vertical="top")
-
-            workbook.save(excel_file)
-            print(f"Results saved to {excel_file}")
-            break
-        except PermissionError:
-            input(
-                f"Please close the file '{excel_file}' and press Enter to continue..."
-            )
+def translate_stage(record):
+    """Translate the extracted text to English"""
+    extracted_text = record["extracted_text"]
+    record["translated_text"] = (
+        translate_text(extracted_text, "en") if extracted_text else ""
+    )
+    # The untranslated fallback must not be cached as the final result; with
+    # no text nothing was translated, so the thread's flag is from another image
+    record["translation_failed"] = (
+        bool(extracted_text) and translation_service.last_failed()
+    )
+    return record
+
+
+def caption_stage(record):
+    """Caption the decoded image; the engine's scheduler handles running out of memory"""
+    record["image_caption"] = generate_caption(record["image"])
+    # The decoded pixels are not needed past this point
+    record.pop("image", None)
+    return record
+
+
+def score_stage(record):
+    """Score the text and caption sentiment and build the result row"""
+    if not record["extracted_text"]:
+        sentiment_translated = "Neutral"
+        score_translated = 0
+    else:
+        (
+            sentiment_translated,
+            neg_translated,
+            neu_translated,
+            pos_translated,
+            score_translated,
+        ) = analyze_sentiment(record["translated_text"])
+
+    (
+        sentiment_caption,
+        neg_caption,
+        neu_caption,
+        pos_caption,
+        score_caption,
+    ) = analyze_sentiment(record["image_caption"])
+
+    overall_score = score_translated + score_caption
+    overall_sentiment = (
+        "Positive"
+        if overall_score >= 0.05
+        else "Negative" if overall_score <= -0.05 else "Neutral"
+    )
+    confidence_level = calculate_confidence(overall_score)
+
+    record["result"] = {
+        "File Name": os.path.basename(record["path"]),
+        "Extracted Text": record["extracted_text"],
+        "Translated Text": record["translated_text"],
+        "Text Sentiment": sentiment_translated,
+        "Image Caption": record["image_caption"],
+        "Caption Sentiment": sentiment_caption,
+        "Overall Sentiment": overall_sentiment,
+        "Confidence": f"{confidence_level}%",
+        "OCR Scale": (
+            round(record["ocr_scale"], 3) if record["ocr_scale"] is not None else None
+        ),
+        "Caption Profile": CAPTION_PROFILE,
+    }
+    if not record.get("translation_failed"):
+        result_cache.put(result_key(record), record["result"])
+    return record
 
 
 def process_image(file_path):
     """Process a single image and return results"""
     try:
         print(f"Currently processing: {os.path.basename(file_path)}")
-        extracted_text = extract_text_with_easyocr(file_path)
-
-        if not extracted_text:
-            translated_text = ""
-            sentiment_translated = "Neutral"
-            score_translated = 0
-        else:
-            translated_text = translate_text(extracted_text, "en")
-            (
-                sentiment_translated,
-                neg_translated,
-                neu_translated,
-                pos_translated,
-                score_translated,
-            ) = analyze_sentiment(translated_text)
-
-        # Retry mechanism for GPU memory
-        for _ in range(5):  # Maximum retry attempts
-            try:
-                with torch.amp.autocast("cuda"):
-                    image_caption = generate_caption(file_path)
-                break  # Exit the retry loop if successful
-            except torch.cuda.OutOfMemoryError:
-                print(f"CUDA Out of Memory for {file_path}. Retrying...")
-                torch.cuda.empty_cache()
-                time.sleep(1)  # Wait 1 second before retrying
-        else:
-            print(f"Failed to process {file_path} due to persistent GPU memory issues.")
-            return None
-
-        (
-            sentiment_caption,
-            neg_caption,
-            neu_caption,
-            pos_caption,
-            score_caption,
-        ) = analyze_sentiment(image_caption)
-
-        overall_score = score_translated + score_caption
-        overall_sentiment = (
-            "Positive"
-            if overall_score >= 0.05
-            else "Negative" if overall_score <= -0.05 else "Neutral"
-        )
-        confidence_level = calculate_confidence(overall_score)
-
-        return {
-            "File Name": os.path.basename(file_path),
-            "Extracted Text": extracted_text,
-            "Translated Text": translated_text,
-            "Text Sentiment": sentiment_translated,
-            "Image Caption": image_caption,
-            "Caption Sentiment": sentiment_caption,
-            "Overall Sentiment": overall_sentiment,
-            "Confidence": f"{confidence_level}%",
-        }
+        record = {"path": file_path}
+        for stage in (
+            decode_stage,
+            ocr_stage,
+            translate_stage,
+            caption_stage,
+            score_stage,
+        ):
+            record = stage(record)
+            if "result" in record:
+                break
+        return record["result"]
     except Exception as e:
         print(f"Error processing {file_path}: {e}")
         return None
 
 
-def process_folder_parallel(folder_path):
-    """Process images in a folder with a maximum of 5 at a time"""
-    image_files = [
-        os.path.join(folder_path, f)
-        for f in os.listdir(folder_path)
-        if f.lower().endswith((".jpg", ".jpeg", ".png"))
+def build_pipeline(on_failure=None, tracer=None):
+    """Build the staged folder pipeline from STAGE_CONFIG"""
+    stage_functions = {
+        "decode": decode_stage,
+        "ocr": ocr_stage,
+        "translate": translate_stage,
+        "caption": caption_stage,
+        "score": score_stage,
+    }
+    stages = [
+        Stage(name, fn, **STAGE_CONFIG[name]) for name, fn in stage_functions.items()
     ]
+    return Pipeline(
+        stages,
+        queue_size=PIPELINE_QUEUE_SIZE,
+        label=lambda record: record["path"],
+        done=lambda record: "result" in record,
+        on_failure=on_failure,
+        tracer=tracer,
+    )
 
-    results = []
-    error_count = 0
 
-    with ThreadPoolExecutor(max_workers=5) as executor:  # Limit to 5 threads
-        futures = {executor.submit(process_image, file): file for file in image_files}
-        for future in tqdm(
-            as_completed(futures), total=len(image_files), desc="Processing Images"
-        ):
-            result = future.result()
-            if result:
-                results.append(result)
-            else:
-                error_count += 1
+def process_folder_parallel(folder_path, resume=False, trace_file=None, dedup=False):
+    """
+    Process the images in a folder and its sub-folders through the staged pipeline.
+
+    Progress is journaled next to the results workbook. With `resume`, images
+    finished by an earlier (possibly crashed) run are skipped and the ones
+    that failed are tried again. Per-stage latencies are printed at the end;
+    with `trace_file`, the full per-image timeline is also saved as Chrome
+    trace JSON (open it in chrome://tracing or Perfetto).
 
-    results_df = pd.DataFrame(results)
+    With `dedup`, the folder is first grouped into clusters of near-duplicate
+    images by perceptual hash. Only one representative per cluster is
+    analysed; its result is copied to the other members, and every row gets
+    a "Cluster ID". This needs the whole file list before analysis starts.
+    """
     output_folder = os.path.dirname(folder_path)
-    create_or_load_excel(output_folder, results_df)
+    sink = ResultsSink(results_excel_file(output_folder), flush_every=FLUSH_EVERY)
+    journal = ProgressJournal(
+        os.path.join(output_folder, "Sentiment_Analysis_Progress.sqlite"),
+        flush_every=FLUSH_EVERY,
+        on_flush=sink.flush,
+    )
+    if resume:
+        print(
+            f"Resuming: {journal.count_in_folder(folder_path, 'done')} image(s) "
+            f"already done, retrying "
+            f"{journal.count_in_folder(folder_path, 'failed')} failed image(s)."
+        )
+    else:
+        journal.forget_folder(folder_path)
+
+    # Load the models once before the worker threads start sharing them
+    if ocr_pool is None:
+        model_registry.get_easyocr_reader(gpu=DEVICE == "cuda")
+    if caption_engine.backend == "onnx":
+        model_registry.get_blip_onnx(caption_engine.onnx_dir)
+    # The ONNX backend still hands beam-search profiles to the torch model, on
+    # the engine's device (always the CPU for ONNX) rather than DEVICE
+    if (
+        caption_engine.backend == "torch"
+        or CAPTION_PROFILES[CAPTION_PROFILE]["num_beams"] > 1
+    ):
+        model_registry.get_blip(caption_engine.device, caption_engine.quantized)
+
+    # Every span is kept only when a Chrome trace is written
+    tracer = Tracer(keep_spans=bool(trace_file))
+    # Images are fed to the pipeline while the folder tree is still being read
+    image_files = (
+        file
+        for file in scan_images(
+            folder_path, extensions=IMAGE_EXTENSIONS, check_magic=True
+        )
+        if not (resume and journal.status(file) == "done")
+    )
+
+    # Representative path -> (cluster id, paths of the other members)
+    clusters = {}
+    if dedup:
+        with tracer.span("dedup"):
+            near_duplicates = NearDuplicateClusters()
+            near_duplicates.add_files(image_files)
+        for cluster_id, representative, others in near_duplicates.groups():
+            clusters[representative] = (cluster_id, others)
+        image_files = list(clusters)
+
+    def on_failure(stage, record, error):
+        journal.mark_failed(record["path"], error)
+        # Members are retried with --resume along with their representative
+        for member in clusters.get(record["path"], (None, []))[1]:
+            journal.mark_failed(member, error)
+
+    pipeline = build_pipeline(on_failure=on_failure, tracer=tracer)
+    records = ({"path": file} for file in image_files)
+    copied = 0
+    for record in tqdm(pipeline.run(records), desc="Processing Images"):
+        with tracer.span("write", record["path"]):
+            result = record["result"]
+            others = []
+            if dedup:
+                cluster_id, others = clusters[record["path"]]
+                result = dict(result, **{"Cluster ID": cluster_id})
+            # Keyed by path, so a row redone by --resume is written only once
+            sink.append(result, key=record["path"])
+            journal.mark_done(record["path"])
+            for member in others:
+                sink.append(
+                    dict(result, **{"File Name": os.path.basename(member)}), key=member
+                )
+                journal.mark_done(member)
+            copied += len(others)
+    error_count = len(pipeline.failures)
+    journal.close()
+    ocr_store.close()
+    result_cache.flush()
+    with tracer.span("workbook"):
+        sink.close()
 
     print(f"Processing complete. {error_count} image(s) were skipped due to errors.")
+    print(
+        f"Captioned {caption_engine.images_captioned} image(s) "
+        f"in {caption_engine.batches_run} batch(es)."
+    )
+    translation_stats = translation_service.stats()
+    print(
+        f"Translation: {translation_stats['requests']} request(s), "
+        f"{translation_stats['cache_hits']} cache hit(s), "
+        f"{translation_stats['backend_calls']} backend call(s), "
+        f"{translation_stats['characters_sent']} character(s) sent."
+    )
+    if translation_stats["sentences_seen"]:
+        skipped = translation_stats["sentences_skipped"]
+        seen = translation_stats["sentences_seen"]
+        print(
+            f"Skipped translation for {skipped} of {seen} sentence(s) "
+            f"({skipped / seen:.1%}) already in English."
+        )
+    if text_detector is not None:
+        text_stats = text_detector.stats()
+        print(
+            f"Text check: skipped OCR for {text_stats['skipped']} of "
+            f"{text_stats['checked']} image(s) with no visible text."
+        )
+    if dedup:
+        dedup_stats = near_duplicates.stats()
+        print(
+            f"Near-duplicates: {dedup_stats['files']} image(s) in "
+            f"{dedup_stats['clusters']} cluster(s); results copied to {copied} "
+            f"image(s), saving {copied * INFERENCE_CALLS_PER_IMAGE} inference call(s)."
+        )
+    cache_stats = result_cache.stats()
+    print(
+        f"Result cache: {cache_stats['hits']} hit(s), {cache_stats['misses']} miss(es)."
+    )
+    caption_engine.scheduler.print_summary()
+    ocr_scheduler.print_summary()
+    ocr_filter.print_summary()
+    if ocr_engine is not None:
+        ocr_engine.print_summary()
+    model_registry.print_report()
+    tracer.print_summary()
+    if trace_file:
+        tracer.export_chrome(trace_file)
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Meme sentiment analysis")
+    parser.add_argument("--folder", help="Process this folder without prompting")
+    parser.add_argument(
+        "--caption-profile",
+        choices=list(CAPTION_PROFILES),
+        default=CAPTION_PROFILE,
+        help="Caption decoding profile for this run",
+    )
+    parser.add_argument(
+        "--trace", help="Save a Chrome trace of the folder run to this JSON file"
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Skip images finished by an earlier run and retry failed ones",
+    )
+    parser.add_argument(
+        "--dedup",
+        action="store_true",
+        help="Analyse one image per cluster of near-duplicates and copy its results",
+    )
+    args = parser.parse_args()
+    CAPTION_PROFILE = args.caption_profile
+
     choice = (
-        input(
+        "folder"
+        if args.folder
+        else input(
             "Do you want to process a specific image or a folder? (Enter 'image' or 'folder'): "
         )
         .strip()
@@ -236,9 +530,14 @@ if __name__ == "__main__":
     )
 
     if choice == "folder":
-        folder_path = input("Enter the folder path: ").strip()
+        folder_path = args.folder or input("Enter the folder path: ").strip()
         if os.path.isdir(folder_path):
-            process_folder_parallel(folder_path)
+            process_folder_parallel(
+                folder_path,
+                resume=args.resume,
+                trace_file=args.trace,
+                dedup=args.dedup,
+            )
         else:
             print(f"The folder '{folder_path}' does not exist.")
 
@@ -246,9 +545,12 @@ if __name__ == "__main__":
         image_path = input("Enter the image file path: ").strip()
         if os.path.isfile(image_path):
             print(f"Processing Image: {image_path}")
+            image = decode_image(image_path)
 
             # Extract text using EasyOCR
-            extracted_text = extract_text_with_easyocr(image_path)
+            ocr_image, ocr_scale = ocr_profile.prepare(image)
+            print(f"OCR Scale ({OCR_PROFILE}): {ocr_scale:.3f}")
+            extracted_text = extract_text_with_easyocr(ocr_image, ocr_scale)
             print(f"Extracted Text: {extracted_text}")
 
             # Translate extracted text if it's in Tagalog (Filipino)
@@ -269,23 +571,8 @@ if __name__ == "__main__":
                 f"Sentiment of Translated Text: {sentiment_translated} (neg={neg_translated}, neu={neu_translated}, pos={pos_translated}, Score: {score_translated})"
             )
 
-            # Retry mechanism for GPU memory
-            for _ in range(5):  # Maximum retry attempts
-                try:
-                    with torch.amp.autocast("cuda"):
-                        image_caption = generate_caption(image_path)
-                    break  # Exit the retry loop if successful
-                except torch.cuda.OutOfMemoryError:
-                    print(f"CUDA Out of Memory for {image_path}. Retrying...")
-                    torch.cuda.empty_cache()
-                    time.sleep(1)  # Wait 1 second before retrying
-            else:
-                print(
-                    f"Failed to process {image_path} due to persistent GPU memory issues."
-                )
-                exit()
-
-            print(f"Image Caption: {image_caption}")
+            image_caption = generate_caption(image)
+            print(f"Image Caption ({CAPTION_PROFILE}): {image_caption}")
 
             # Analyze sentiment of the image caption
             sentiment_caption, neg_caption, neu_caption, pos_caption, score_caption = (
@@ -1,7 +1,6 @@
 import os
-import easyocr
+import sys
 from googletrans import Translator
-from transformers import BlipProcessor, BlipForConditionalGeneration
 from PIL import Image
 from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
 import pandas as pd
@@ -10,6 +9,10 @@ from openpyxl.utils.dataframe import dataframe_to_rows
 import matplotlib.pyplot as plt
 import torch
 
+# Shared modules live in the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import model_registry
+
 # Check if CUDA is available
 device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
 if not torch.cuda.is_available():
@@ -21,8 +24,8 @@ analyzer = SentimentIntensityAnalyzer()
 
 
 def extract_text_with_easyocr(image_path):
-    reader = easyocr.Reader(["en", "tl"], gpu=True)  # Enable GPU
-    result = reader.readtext(image_path)
+    with model_registry.get_easyocr_reader(gpu=True) as reader:
+        result = reader.readtext(image_path)
     extracted_text = " ".join([item[1] for item in result])
     return extracted_text
 
@@ -40,20 +43,14 @@ def translate_text(text, target_language="en"):
 
 
 def generate_caption(image_path):
-    processor = BlipProcessor.from_pretrained("Salesforce/blip-image-captioning-base")
-    model = BlipForConditionalGeneration.from_pretrained(
-        "Salesforce/blip-image-captioning-base"
-    ).to(
-        device
-    )  # Move model to GPU
-
     image = Image.open(image_path)
-    inputs = processor(images=image, return_tensors="pt")
-    # Move inputs to GPU
-    inputs = {k: v.to(device) for k, v in inputs.items()}
+    with model_registry.get_blip(device.type) as (processor, model):
+        inputs = processor(images=image, return_tensors="pt")
+        # Move inputs to GPU
+        inputs = {k: v.to(device) for k, v in inputs.items()}
 
-    out = model.generate(**inputs)
-    caption = processor.decode(out[0], skip_special_tokens=True)
+        out = model.generate(**inputs)
+        caption = processor.decode(out[0], skip_special_tokens=True)
     return caption
 
 
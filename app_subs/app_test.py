@@ -1,7 +1,6 @@
 import os
-import easyocr
+import sys
 from googletrans import Translator
-from transformers import BlipProcessor, BlipForConditionalGeneration
 from PIL import Image
 from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
 import pandas as pd
@@ -15,14 +14,18 @@ from concurrent.futures import ThreadPoolExecutor, as_completed
 from tqdm import tqdm
 import time
 
+# Shared modules live in the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import model_registry
+
 # Initialize the VADER sentiment analyzer
 analyzer = SentimentIntensityAnalyzer()
 
 
 def extract_text_with_easyocr(image_path):
     """Extract text from an image using EasyOCR"""
-    reader = easyocr.Reader(["en", "tl"], gpu=True)
-    result = reader.readtext(image_path)
+    with model_registry.get_easyocr_reader(gpu=True) as reader:
+        result = reader.readtext(image_path)
     extracted_text = " ".join([item[1] for item in result])
     return extracted_text
 
@@ -42,16 +45,12 @@ def translate_text(text, target_language="en"):
 
 def generate_caption(image_path):
     """Generate a caption using BLIP"""
-    processor = BlipProcessor.from_pretrained("Salesforce/blip-image-captioning-base")
-    model = BlipForConditionalGeneration.from_pretrained(
-        "Salesforce/blip-image-captioning-base"
-    ).to("cuda")
-
     image = Image.open(image_path)
-    inputs = processor(images=image, return_tensors="pt").to("cuda")
-    with torch.amp.autocast("cuda"):
-        out = model.generate(**inputs)
-    caption = processor.decode(out[0], skip_special_tokens=True)
+    with model_registry.get_blip("cuda") as (processor, model):
+        inputs = processor(images=image, return_tensors="pt").to("cuda")
+        with torch.amp.autocast("cuda"):
+            out = model.generate(**inputs)
+        caption = processor.decode(out[0], skip_special_tokens=True)
     return caption
 
 
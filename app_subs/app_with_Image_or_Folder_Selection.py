@@ -1,7 +1,6 @@
 import os
-import easyocr
+import sys
 from googletrans import Translator
-from transformers import BlipProcessor, BlipForConditionalGeneration
 from PIL import Image
 from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
 import pandas as pd
@@ -10,6 +9,10 @@ from openpyxl.utils.dataframe import dataframe_to_rows
 import matplotlib.pyplot as plt
 import torch
 
+# Shared modules live in the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import model_registry
+
 
 # Initialize the VADER sentiment analyzer
 analyzer = SentimentIntensityAnalyzer()
@@ -17,8 +20,8 @@ analyzer = SentimentIntensityAnalyzer()
 
 def extract_text_with_easyocr(image_path):
     """Extract text from an image using EasyOCR"""
-    reader = easyocr.Reader(["en", "tl"], gpu=True)
-    result = reader.readtext(image_path)
+    with model_registry.get_easyocr_reader(gpu=True) as reader:
+        result = reader.readtext(image_path)
     # Extracting text from the result
     extracted_text = " ".join([item[1] for item in result])
     return extracted_text
@@ -39,20 +42,16 @@ def translate_text(text, target_language="en"):
 
 def generate_caption(image_path):
     """Generate a caption using BLIP"""
-    processor = BlipProcessor.from_pretrained("Salesforce/blip-image-captioning-base")
-    model = BlipForConditionalGeneration.from_pretrained(
-        "Salesforce/blip-image-captioning-base"
-    )
-
     # Open the image
     image = Image.open(image_path)
 
-    # Preprocess the image and generate the caption
-    inputs = processor(images=image, return_tensors="pt")
-    out = model.generate(**inputs)
+    with model_registry.get_blip("cpu") as (processor, model):
+        # Preprocess the image and generate the caption
+        inputs = processor(images=image, return_tensors="pt")
+        out = model.generate(**inputs)
 
-    # Decode and return the caption
-    caption = processor.decode(out[0], skip_special_tokens=True)
+        # Decode and return the caption
+        caption = processor.decode(out[0], skip_special_tokens=True)
     return caption
 
 
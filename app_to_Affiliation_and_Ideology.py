@@ -1,10 +1,12 @@
 import pandas as pd
-from transformers import AutoTokenizer, AutoModelForSequenceClassification
 import torch
-from concurrent.futures import ThreadPoolExecutor
 from tqdm import tqdm
 import random
 
+import devices
+import model_registry
+from batch_scheduler import BatchScheduler
+
 # Define the mapping between ideologies and political affiliations
 IDEOLOGY_TO_AFFILIATION = {
     "Conservatism": ["PDP-Laban", "Nacionalista Party"],
@@ -18,10 +20,17 @@ IDEOLOGY_TO_AFFILIATION = {
     "Liberalism": ["Liberal Party", "Aksyon Demokratiko", "PFP"],  # Added PFP here
 }
 
+# CUDA when available, otherwise the CPU; set QUANTIZE_ON_CPU to use the int8
+# classifier on CPU-only machines
+DEVICE = devices.pick_device()
+QUANTIZE_ON_CPU = False
+USE_INT8 = QUANTIZE_ON_CPU and DEVICE == "cpu"
+
 # Load your trained ideology model and tokenizer
 MODEL_NAME = "fine_tuned_model_for_PoliticalIdeology"
-tokenizer = AutoTokenizer.from_pretrained(MODEL_NAME)
-model = AutoModelForSequenceClassification.from_pretrained(MODEL_NAME).to("cuda")
+classifier = model_registry.get_ideology_classifier(
+    MODEL_NAME, DEVICE, quantized=USE_INT8
+)
 
 # Make sure to match these labels with your model's output
 IDEOLOGY_LABELS = {
@@ -37,17 +46,36 @@ IDEOLOGY_LABELS = {
 }
 
 
+# Texts per classifier forward pass, shrunk automatically if memory runs out
+ideology_scheduler = BatchScheduler("Ideology", DEVICE, max_batch_size=32)
+
+
+# Function to predict the ideology label ids of a batch of texts
+def predict_ideology_batch(texts):
+    with classifier as (tokenizer, model):
+        inputs = tokenizer(
+            texts, return_tensors="pt", truncation=True, padding=True
+        ).to(DEVICE)
+        with torch.no_grad():
+            outputs = model(**inputs)
+    return torch.argmax(outputs.logits, dim=1).tolist()
+
+
+# Function to predict the ideology of many texts
+def predict_ideologies(texts):
+    ideologies = ["Unclassified"] * len(texts)
+    indices = [i for i, text in enumerate(texts) if text.strip()]
+    predictions = ideology_scheduler.map(
+        [texts[i] for i in indices], predict_ideology_batch
+    )
+    for i, prediction in zip(indices, predictions):
+        ideologies[i] = IDEOLOGY_LABELS[prediction]
+    return ideologies
+
+
 # Function to predict ideology
 def predict_ideology(text):
-    if not text.strip():
-        return "Unclassified"
-    inputs = tokenizer(text, return_tensors="pt", truncation=True, padding=True).to(
-        "cuda"
-    )
-    with torch.no_grad():
-        outputs = model(**inputs)
-    predictions = torch.argmax(outputs.logits, dim=1).item()
-    return IDEOLOGY_LABELS[predictions]
+    return predict_ideologies([text])[0]
 
 
 # Function to map ideology to affiliation
@@ -82,14 +110,11 @@ if not all(col in df.columns for col in required_columns):
         f"Input Excel file must contain the following columns: {', '.join(required_columns)}"
     )
 
-# Multithreading for predictions
 predicted_ideologies = []
 political_affiliations = []
 
 
-def process_row(text):
-    # Predict ideology
-    ideology = predict_ideology(text if isinstance(text, str) else "")
+def process_row(ideology):
     # Map to political affiliation
     affiliation = map_affiliation(ideology)
 
@@ -100,17 +125,13 @@ def process_row(text):
     return ideology, affiliation
 
 
-# Use ThreadPoolExecutor to process rows concurrently with progress bar
-with ThreadPoolExecutor(
-    max_workers=8
-) as executor:  # Adjust max_workers based on your GPU capability
-    results = list(
-        tqdm(
-            executor.map(process_row, df["Translated Text"].tolist()),
-            total=len(df),
-            desc="Processing rows",
-        )
-    )
+# Predict every row's ideology in batches, then map each to an affiliation
+texts = [text if isinstance(text, str) else "" for text in df["Translated Text"]]
+results = [
+    process_row(ideology)
+    for ideology in tqdm(predict_ideologies(texts), desc="Processing rows")
+]
+ideology_scheduler.print_summary()
 
 # Unpack results
 for ideology, affiliation in results:
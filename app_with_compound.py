@@ -1,58 +1,48 @@
 import os
-import easyocr
-from googletrans import Translator
-from transformers import BlipProcessor, BlipForConditionalGeneration
-from PIL import Image
 from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
 import pandas as pd
 from openpyxl import Workbook, load_workbook
 from openpyxl.utils.dataframe import dataframe_to_rows
 from openpyxl.styles import Alignment
 import matplotlib.pyplot as plt
-import torch
-from torch.cuda.amp import autocast
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from tqdm import tqdm
-import time
+
+import devices
+import model_registry
+from caption_engine import CaptionEngine
+from translation import TranslationService, get_backend
 
 # Initialize the VADER sentiment analyzer
 analyzer = SentimentIntensityAnalyzer()
 
+# CUDA when available, otherwise the CPU
+DEVICE = devices.pick_device()
+
+# "google" for the web service, "marian" for the local tl->en model
+TRANSLATION_BACKEND = "google"
+translation_service = TranslationService(get_backend(TRANSLATION_BACKEND))
+
+# Captions from all worker threads are batched through one BLIP engine
+caption_engine = CaptionEngine(device=DEVICE)
+
 
 def extract_text_with_easyocr(image_path):
     """Extract text from an image using EasyOCR"""
-    reader = easyocr.Reader(["en", "tl"], gpu=True)
-    result = reader.readtext(image_path)
+    with model_registry.get_easyocr_reader(gpu=DEVICE == "cuda") as reader:
+        result = reader.readtext(image_path)
     extracted_text = " ".join([item[1] for item in result])
     return extracted_text
 
 
 def translate_text(text, target_language="en"):
     """Translates extracted text to the target language"""
-    if not text.strip():
-        return ""
-    try:
-        translator = Translator()
-        translated = translator.translate(text, dest=target_language)
-        return translated.text
-    except Exception as e:
-        print(f"Error during translation: {e}")
-        return text
+    return translation_service.translate(text, target_language)
 
 
 def generate_caption(image_path):
-    """Generate a caption using BLIP"""
-    processor = BlipProcessor.from_pretrained("Salesforce/blip-image-captioning-base")
-    model = BlipForConditionalGeneration.from_pretrained(
-        "Salesforce/blip-image-captioning-base"
-    ).to("cuda")
-
-    image = Image.open(image_path)
-    inputs = processor(images=image, return_tensors="pt").to("cuda")
-    with torch.amp.autocast("cuda"):
-        out = model.generate(**inputs)
-    caption = processor.decode(out[0], skip_special_tokens=True)
-    return caption
+    """Generate a caption using BLIP, shrinking batches if memory runs out"""
+    return caption_engine.caption(image_path)
 
 
 def analyze_sentiment(text):
@@ -154,19 +144,7 @@ def process_image(file_path):
                 score_translated,
             ) = analyze_sentiment(translated_text)
 
-        # Retry mechanism for GPU memory
-        for _ in range(5):  # Maximum retry attempts
-            try:
-                with torch.amp.autocast("cuda"):
-                    image_caption = generate_caption(file_path)
-                break  # Exit the retry loop if successful
-            except torch.cuda.OutOfMemoryError:
-                print(f"CUDA Out of Memory for {file_path}. Retrying...")
-                torch.cuda.empty_cache()
-                time.sleep(1)  # Wait 1 second before retrying
-        else:
-            print(f"Failed to process {file_path} due to persistent GPU memory issues.")
-            return None
+        image_caption = generate_caption(file_path)
 
         (
             sentiment_caption,
@@ -212,6 +190,10 @@ def process_folder_parallel(folder_path):
     results = []
     error_count = 0
 
+    # Load the models once before the worker threads start sharing them
+    model_registry.get_easyocr_reader(gpu=DEVICE == "cuda")
+    model_registry.get_blip(DEVICE)
+
     with ThreadPoolExecutor(max_workers=5) as executor:  # Limit to 5 threads
         futures = {executor.submit(process_image, file): file for file in image_files}
         for future in tqdm(
@@ -228,6 +210,7 @@ def process_folder_parallel(folder_path):
     create_or_load_excel(output_folder, results_df)
 
     print(f"Processing complete. {error_count} image(s) were skipped due to errors.")
+    model_registry.print_report()
 
 
 if __name__ == "__main__":
@@ -273,22 +256,7 @@ if __name__ == "__main__":
                 f"Sentiment of Translated Text: {sentiment_translated} (neg={neg_translated}, neu={neu_translated}, pos={pos_translated}, Score: {score_translated})"
             )
 
-            # Retry mechanism for GPU memory
-            for _ in range(5):  # Maximum retry attempts
-                try:
-                    with torch.amp.autocast("cuda"):
-                        image_caption = generate_caption(image_path)
-                    break  # Exit the retry loop if successful
-                except torch.cuda.OutOfMemoryError:
-                    print(f"CUDA Out of Memory for {image_path}. Retrying...")
-                    torch.cuda.empty_cache()
-                    time.sleep(1)  # Wait 1 second before retrying
-            else:
-                print(
-                    f"Failed to process {image_path} due to persistent GPU memory issues."
-                )
-                exit()
-
+            image_caption = generate_caption(image_path)
             print(f"Image Caption: {image_caption}")
 
             # Analyze sentiment of the image caption
@@ -0,0 +1,201 @@
+import threading
+
+import torch
+
+import devices
+
+# CUDA's peak-memory counter is shared by the whole process, so only one
+# batch at a time (of any scheduler) resets and reads it
+_measure_lock = threading.Lock()
+
+
+class BatchScheduler:
+    """
+    Picks batch sizes for a model from the memory that is actually free.
+
+    When a batch runs out of memory the scheduler halves the batch size and
+    runs the same items again in smaller pieces, so an item is only lost if
+    it fails on its own. After `grow_after` batches in a row succeed, the
+    size doubles again, up to `max_batch_size` but below the smallest size
+    that has run out of memory, until `retry_after` batches in a row have
+    succeeded since then and that size is tried again.
+
+    The scheduler also learns roughly how many bytes one item needs. On CUDA
+    this comes from the peak allocation of batches, measured for one batch
+    at a time across all schedulers; batches that start while another is
+    being measured simply run unmeasured. Everywhere, a failed batch shows
+    that its items needed more than the memory that was free at the time;
+    that estimate is forgotten together with the failed size, so only
+    measured peaks cap the batch size for good. Before each batch the size
+    is capped so that the estimate fits in the free GPU memory, or the
+    available RAM on the CPU.
+
+    Args:
+        name (str): Label used in the run summary.
+        device (str): Torch device the model runs on.
+        max_batch_size (int): Largest batch the scheduler will try.
+        min_batch_size (int): Smallest batch; running out of memory at this
+            size raises the error.
+        grow_after (int): Successful batches in a row before growing.
+        retry_after (int): Successful batches in a row after which sizes that
+            ran out of memory are no longer avoided.
+        headroom (float): Fraction of the free memory left unused.
+    """
+
+    def __init__(
+        self,
+        name,
+        device,
+        max_batch_size,
+        min_batch_size=1,
+        grow_after=4,
+        retry_after=64,
+        headroom=0.2,
+    ):
+        self.name = name
+        self.device = device
+        self.max_batch_size = max_batch_size
+        self.min_batch_size = min_batch_size
+        self.grow_after = grow_after
+        self.retry_after = retry_after
+        self.headroom = headroom
+        self.batch_size = max_batch_size
+        self.item_bytes = None
+        self._failed_item_bytes = None
+        self.batches_run = 0
+        self.out_of_memory = 0
+        self.shrinks = 0
+        self.grows = 0
+        self._streak = 0
+        self._successes = 0
+        self._failed_at = None
+        self._lock = threading.Lock()
+
+    def _next_size(self, remaining):
+        """Batch size for the next batch: the current size, capped by memory"""
+        with self._lock:
+            size = self.batch_size
+            item_bytes = max(self.item_bytes or 0, self._failed_item_bytes or 0)
+        if item_bytes:
+            free = devices.available_memory(self.device)
+            if free is not None:
+                fits = int(free * (1 - self.headroom) // item_bytes)
+                size = min(size, max(self.min_batch_size, fits))
+        return max(1, min(size, remaining))
+
+    def _measured(self, run, argument, size):
+        """Call `run(argument)`; return its result and the peak bytes per item"""
+        if not self.device.startswith("cuda") or not _measure_lock.acquire(
+            blocking=False
+        ):
+            return run(argument), None
+        try:
+            torch.cuda.reset_peak_memory_stats()
+            baseline = torch.cuda.memory_allocated()
+            result = run(argument)
+            return result, (torch.cuda.max_memory_allocated() - baseline) / size
+        finally:
+            _measure_lock.release()
+
+    def _succeeded(self, peak):
+        with self._lock:
+            self.batches_run += 1
+            if peak:
+                self.item_bytes = max(self.item_bytes or 0, peak)
+            self._streak += 1
+            self._successes += 1
+            # Out-of-memory failures long ago may have been a passing spike
+            if self._failed_at is not None and self._successes >= self.retry_after:
+                self._failed_at = None
+                self._failed_item_bytes = None
+            ceiling = self.max_batch_size
+            if self._failed_at is not None:
+                ceiling = min(ceiling, self._failed_at - 1)
+            if self._streak >= self.grow_after and self.batch_size < ceiling:
+                self.batch_size = min(ceiling, self.batch_size * 2)
+                self.grows += 1
+                self._streak = 0
+
+    def _failed(self, size, error):
+        """Shrink after an out-of-memory error; re-raise it if we cannot"""
+        devices.empty_cache(self.device)
+        if size <= self.min_batch_size:
+            raise error
+        free = devices.available_memory(self.device)
+        with self._lock:
+            self.out_of_memory += 1
+            self._streak = 0
+            self._successes = 0
+            self._failed_at = min(self._failed_at or size, size)
+            if free:
+                self._failed_item_bytes = max(self._failed_item_bytes or 0, free / size)
+            smaller = max(self.min_batch_size, size // 2)
+            if smaller < self.batch_size:
+                self.batch_size = smaller
+                self.shrinks += 1
+        print(f"{self.name}: out of memory at batch size {size}, now {smaller}.")
+
+    def map(self, items, run_batch):
+        """
+        Run `run_batch` over `items` in memory-sized batches.
+
+        Args:
+            items (list): Inputs to process.
+            run_batch (callable): Takes a list of items and returns a list with
+                one output per item.
+
+        Returns:
+            list: The outputs for every item, in input order.
+        """
+        items = list(items)
+        outputs = []
+        start = 0
+        while start < len(items):
+            size = self._next_size(len(items) - start)
+            batch = items[start : start + size]
+            try:
+                results, peak = self._measured(run_batch, batch, size)
+            except Exception as e:
+                if not devices.is_out_of_memory(e):
+                    raise
+                self._failed(size, e)
+                continue
+            self._succeeded(peak)
+            outputs.extend(results)
+            start += size
+        return outputs
+
+    def call(self, run):
+        """
+        Call `run(batch_size)` for models that batch internally (like
+        EasyOCR's recognizer), retrying with a smaller size on OOM.
+        """
+        while True:
+            size = self._next_size(self.max_batch_size)
+            try:
+                result, peak = self._measured(run, size, size)
+            except Exception as e:
+                if not devices.is_out_of_memory(e):
+                    raise
+                self._failed(size, e)
+                continue
+            self._succeeded(peak)
+            return result
+
+    def stats(self):
+        with self._lock:
+            return {
+                "batch_size": self.batch_size,
+                "batches_run": self.batches_run,
+                "out_of_memory": self.out_of_memory,
+                "shrinks": self.shrinks,
+                "grows": self.grows,
+            }
+
+    def print_summary(self):
+        stats = self.stats()
+        print(
+            f"{self.name}: {stats['batches_run']} batch(es), "
+            f"{stats['out_of_memory']} out-of-memory retry(ies), "
+            f"batch size now {stats['batch_size']}."
+        )
@@ -0,0 +1,85 @@
+"""
+Compares the caption profiles: latency per image and how often the VADER
+sentiment label of the caption changes against the "balanced" profile.
+
+Run from the repository root:
+    python -m benchmarks.caption_profile_benchmark --images uploads --limit 200
+"""
+
+import argparse
+import json
+import time
+
+import devices
+import model_registry
+from caption_engine import CAPTION_PROFILES, DEFAULT_CAPTION_PROFILE, CaptionEngine
+from image_scanner import scan_images
+from sentiment_batch import polarity_scores, sentiment_labels
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--images", default="uploads", help="Folder of sample memes")
+    parser.add_argument("--limit", type=int, default=200)
+    parser.add_argument("--batch-size", type=int, default=8)
+    parser.add_argument("--device", default=None, help="cpu or cuda")
+    parser.add_argument("--output", help="Also write the report to this JSON file")
+    args = parser.parse_args()
+
+    image_files = sorted(scan_images(args.images, recursive=False))[: args.limit]
+    if not image_files:
+        print(f"No images found in '{args.images}'.")
+        return
+
+    device = devices.pick_device(args.device)
+    engine = CaptionEngine(device=device, max_batch_size=args.batch_size)
+    # Load BLIP before anything is timed
+    model_registry.get_blip(device)
+    engine.caption(image_files[0])
+
+    captions = {}
+    report = {}
+    for name, settings in CAPTION_PROFILES.items():
+        start = time.perf_counter()
+        captions[name] = engine.caption_many(image_files, profile=name)
+        seconds = time.perf_counter() - start
+        report[name] = {
+            "settings": settings,
+            "ms_per_image": round(1000 * seconds / len(image_files), 1),
+            "mean_words": round(
+                sum(len(caption.split()) for caption in captions[name])
+                / len(image_files),
+                2,
+            ),
+        }
+
+    reference = captions[DEFAULT_CAPTION_PROFILE]
+    reference_labels = sentiment_labels([polarity_scores(c)[3] for c in reference])
+    for name, rows in report.items():
+        labels = sentiment_labels([polarity_scores(c)[3] for c in captions[name]])
+        rows["identical_captions"] = round(
+            sum(a == b for a, b in zip(captions[name], reference)) / len(reference), 4
+        )
+        rows["sentiment_label_changes"] = round(
+            float((labels != reference_labels).mean()), 4
+        )
+
+    print(f"{len(image_files)} image(s), compared against '{DEFAULT_CAPTION_PROFILE}'")
+    print(
+        f"{'profile':>10} {'ms/img':>9} {'words':>7} {'identical':>10} "
+        f"{'label changes':>14}"
+    )
+    for name, rows in report.items():
+        print(
+            f"{name:>10} {rows['ms_per_image']:>9.1f} {rows['mean_words']:>7.2f} "
+            f"{rows['identical_captions']:>10.2%} "
+            f"{rows['sentiment_label_changes']:>14.2%}"
+        )
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=2)
+        print(f"Report saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+Compares per-image EasyOCR readtext with the OCR engine's pooled recognition.
+
+Both read the same RGB images after the OCR profile's rescaling, with the
+same greyscale conversion and reading order, so the only difference left in
+the text is pooling itself: the engine pads every crop to the widest crop
+of the whole pool, while readtext pads to the widest crop of one image. The
+engine is timed over pools of --pool images at a time, which is what it sees
+when the pipeline's OCR threads keep it busy. Agreement is the
+character-level difflib ratio between the two joined texts, averaged over
+the images.
+
+Run from the repository root:
+    python -m benchmarks.ocr_batching_benchmark --images uploads --pool 16
+"""
+
+import argparse
+import difflib
+import json
+import time
+
+import devices
+import model_registry
+from image_decode import decode_image
+from image_scanner import scan_images
+from ocr_engine import OcrEngine, readtext_rgb
+from ocr_preprocess import get_profile
+
+
+def joined(result):
+    return " ".join(item[1] for item in result)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--images", default="uploads", help="Folder of sample memes")
+    parser.add_argument("--limit", type=int, default=200)
+    parser.add_argument("--pool", type=int, default=16, help="Images per pool")
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--profile", default="balanced", help="OCR profile")
+    parser.add_argument("--device", default=None, help="cpu or cuda")
+    parser.add_argument("--output", help="Also write the report to this JSON file")
+    args = parser.parse_args()
+
+    image_files = sorted(scan_images(args.images, recursive=False))[: args.limit]
+    if not image_files:
+        print(f"No images found in '{args.images}'.")
+        return
+    profile = get_profile(args.profile)
+    images = [profile.prepare(decode_image(path))[0] for path in image_files]
+
+    device = devices.pick_device(args.device)
+    gpu = device == "cuda"
+    handle = model_registry.get_easyocr_reader(gpu=gpu)
+    engine = OcrEngine(gpu=gpu)
+    engine.scheduler.max_batch_size = args.batch_size
+    # Warm both paths up before anything is timed
+    with handle as reader:
+        readtext_rgb(reader, images[0])
+    engine.read_many(images[:1])
+    engine.pools_run = engine.images_read = engine.crops_recognized = 0
+
+    start = time.perf_counter()
+    with handle as reader:
+        per_image = [
+            joined(readtext_rgb(reader, image, batch_size=args.batch_size))
+            for image in images
+        ]
+    per_image_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    pooled = []
+    for index in range(0, len(images), args.pool):
+        pooled.extend(
+            joined(result)
+            for result in engine.read_many(images[index : index + args.pool])
+        )
+    pooled_seconds = time.perf_counter() - start
+
+    agreement = [
+        difflib.SequenceMatcher(None, a, b).ratio() for a, b in zip(per_image, pooled)
+    ]
+    stats = engine.stats()
+    report = {
+        "images": len(images),
+        "pool": args.pool,
+        "batch_size": args.batch_size,
+        "readtext_ms_per_image": round(1000 * per_image_seconds / len(images), 1),
+        "pooled_ms_per_image": round(1000 * pooled_seconds / len(images), 1),
+        "speedup": round(per_image_seconds / pooled_seconds, 2),
+        "crops_per_pool": round(stats["crops_recognized"] / stats["pools_run"], 1),
+        "identical_texts": round(
+            sum(a == b for a, b in zip(per_image, pooled)) / len(images), 4
+        ),
+        "mean_agreement": round(sum(agreement) / len(agreement), 4),
+    }
+
+    print(f"{len(images)} image(s) on {device}, pools of {args.pool}")
+    print(f"  readtext per image: {report['readtext_ms_per_image']:.1f} ms/img")
+    print(
+        f"  pooled recognition: {report['pooled_ms_per_image']:.1f} ms/img "
+        f"({report['speedup']:.2f}x, {report['crops_per_pool']} crops per pass)"
+    )
+    print(
+        f"  identical texts: {report['identical_texts']:.2%}, "
+        f"mean agreement: {report['mean_agreement']:.4f}"
+    )
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=2)
+        print(f"Report saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""
+Compares OCR speed and accuracy across the OCR rescaling profiles.
+
+The reference text for an image is its "Extracted Text" in the results
+workbooks when the file name is listed there, and otherwise the text read
+from the image at its original size. Similarity is the character-level
+difflib ratio against that reference, averaged over the images.
+
+Run from the repository root:
+    python -m benchmarks.ocr_profile_benchmark --images uploads --output ocr.json
+"""
+
+import argparse
+import difflib
+import json
+import os
+import time
+
+import pandas as pd
+
+import devices
+import model_registry
+from image_decode import decode_image
+from image_scanner import scan_images
+from ocr_engine import readtext_rgb
+from ocr_preprocess import OCR_PROFILES
+
+DEFAULT_WORKBOOKS = [
+    "Results/RQ1_and_RQ2/Sentiment_Analysis_Results.xlsx",
+    "Results/RQ4/backup/PoliticalIdeology_Results.xlsx",
+]
+
+
+def load_reference_texts(workbooks):
+    """File name -> Extracted Text from every workbook that exists"""
+    references = {}
+    for workbook in workbooks:
+        if not os.path.exists(workbook):
+            print(f"Skipping missing workbook '{workbook}'.")
+            continue
+        df = pd.read_excel(workbook, usecols=["File Name", "Extracted Text"])
+        for name, text in zip(df["File Name"], df["Extracted Text"].fillna("")):
+            references.setdefault(str(name), str(text))
+    return references
+
+
+def normalized(text):
+    return " ".join(text.lower().split())
+
+
+def similarity(text, reference):
+    return difflib.SequenceMatcher(
+        None, normalized(text), normalized(reference)
+    ).ratio()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--images", default="uploads", help="Folder of sample memes")
+    parser.add_argument("--workbooks", nargs="*", default=DEFAULT_WORKBOOKS)
+    parser.add_argument("--limit", type=int, default=200)
+    parser.add_argument("--device", default=None, help="cpu or cuda")
+    parser.add_argument("--output", help="Also write the report to this JSON file")
+    args = parser.parse_args()
+
+    image_files = sorted(scan_images(args.images, recursive=False))[: args.limit]
+    if not image_files:
+        print(f"No images found in '{args.images}'.")
+        return
+    images = [decode_image(path) for path in image_files]
+    references = load_reference_texts(args.workbooks)
+
+    device = devices.pick_device(args.device)
+    handle = model_registry.get_easyocr_reader(gpu=device == "cuda")
+
+    texts = {}
+    report = {}
+    # "original" runs first so its output can stand in for missing references
+    for name in sorted(OCR_PROFILES, key=lambda name: name != "original"):
+        profile = OCR_PROFILES[name]
+        texts[name] = []
+        scales = []
+        seconds = 0.0
+        with handle as reader:
+            for image in images:
+                prepared, scale = profile.prepare(image)
+                start = time.perf_counter()
+                result = readtext_rgb(reader, prepared)
+                seconds += time.perf_counter() - start
+                texts[name].append(" ".join(item[1] for item in result))
+                scales.append(scale)
+        report[name] = {
+            "max_side": profile.max_side,
+            "min_side": profile.min_side,
+            "ms_per_image": round(1000 * seconds / len(images), 1),
+            "mean_scale": round(sum(scales) / len(scales), 3),
+        }
+
+    from_workbooks = 0
+    reference_texts = []
+    for path, original in zip(image_files, texts["original"]):
+        reference = references.get(os.path.basename(path))
+        from_workbooks += reference is not None
+        reference_texts.append(original if reference is None else reference)
+    baseline = report["original"]["ms_per_image"]
+    for name, rows in report.items():
+        scores = [similarity(a, b) for a, b in zip(texts[name], reference_texts)]
+        rows["similarity"] = round(sum(scores) / len(scores), 4)
+        rows["speedup"] = round(baseline / rows["ms_per_image"], 2)
+
+    print(
+        f"{len(images)} image(s); {from_workbooks} compared against workbook text, "
+        f"{len(images) - from_workbooks} against the original-size OCR."
+    )
+    print(
+        f"{'profile':>10} {'ms/img':>9} {'speedup':>8} {'scale':>7} {'similarity':>11}"
+    )
+    for name, rows in report.items():
+        print(
+            f"{name:>10} {rows['ms_per_image']:>9.1f} {rows['speedup']:>7.2f}x "
+            f"{rows['mean_scale']:>7.3f} {rows['similarity']:>11.4f}"
+        )
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=2)
+        print(f"Report saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
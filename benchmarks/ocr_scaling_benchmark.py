@@ -0,0 +1,65 @@
+"""
+Measures how OCR throughput scales with the number of OcrPool worker processes.
+
+Every run splits the machine's cores evenly between its workers, so the
+speedup column shows how close the pool gets to linear scaling.
+
+Run from the repository root:
+    python -m benchmarks.ocr_scaling_benchmark --images uploads --count 64
+"""
+
+import argparse
+import itertools
+import os
+import time
+
+from image_scanner import scan_images
+from ocr_pool import OcrPool
+
+
+def worker_counts(cores):
+    """1, 2, 4, ... up to the core count (which is always included)"""
+    counts = []
+    count = 1
+    while count < cores:
+        counts.append(count)
+        count *= 2
+    counts.append(cores)
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--images", default="uploads", help="Folder of sample memes")
+    parser.add_argument("--count", type=int, default=64, help="Images per run")
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    sources = sorted(scan_images(args.images, recursive=False))
+    if not sources:
+        print(f"No images found in '{args.images}'.")
+        return
+    # Repeat the samples so every run has the same amount of work
+    images = list(itertools.islice(itertools.cycle(sources), args.count))
+
+    baseline = None
+    print(f"{'workers':>8} {'threads':>8} {'seconds':>9} {'img/s':>8} {'speedup':>8}")
+    for workers in worker_counts(args.max_workers):
+        pool = OcrPool(workers=workers)
+        # Start every worker and load its reader before timing
+        pool.map(sources[:1] * workers)
+        start = time.perf_counter()
+        pool.map(images)
+        seconds = time.perf_counter() - start
+        pool.close()
+
+        rate = len(images) / seconds
+        baseline = baseline or rate
+        print(
+            f"{workers:>8} {pool.threads_per_worker:>8} {seconds:>9.2f} "
+            f"{rate:>8.2f} {rate / baseline:>7.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
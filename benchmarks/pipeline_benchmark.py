@@ -0,0 +1,260 @@
+"""
+Benchmarks the app_main pipeline on synthetic memes: each stage on its own,
+then whole folder runs across worker counts and caption batch sizes.
+
+Translation uses the offline glossary backend so runs do not depend on the
+network, and every folder run starts with empty result and translation
+caches. The report is written as JSON so runs can be compared over time.
+
+Run from the repository root:
+    python -m benchmarks.pipeline_benchmark --count 60 --workers 1,4,8 --batch-sizes 1,8
+"""
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import tempfile
+import time
+
+import pandas as pd
+import torch
+
+import app_main
+from benchmarks.synthetic_memes import DEFAULT_SIZES, generate_memes, parse_sizes
+from caption_engine import CaptionEngine
+from image_decode import decode_image
+from ocr_engine import OcrEngine
+from ocr_store import OcrStore
+from result_cache import ResultCache
+from translation import OfflineBackend, TranslationService
+
+# How long app_main's engines wait for a batch to fill
+CAPTION_MAX_WAIT = app_main.caption_engine.max_wait
+OCR_MAX_WAIT = app_main.ocr_engine.max_wait if app_main.ocr_engine is not None else 0
+
+
+def parse_counts(value):
+    return [int(count) for count in value.split(",")]
+
+
+def summarize(seconds):
+    """Total, mean and median milliseconds of a list of timings"""
+    return {
+        "calls": len(seconds),
+        "total_ms": round(1000 * sum(seconds), 1),
+        "mean_ms": round(1000 * statistics.mean(seconds), 2),
+        "median_ms": round(1000 * statistics.median(seconds), 2),
+    }
+
+
+def fresh_state(
+    workdir, run_name, translate_delay, caption_batch_size=8, batching=True
+):
+    """
+    Empty caches and new engines so runs do not help each other.
+
+    With `batching` off the engines run every request as soon as it arrives,
+    since one image at a time would otherwise wait out every batch window.
+    """
+    app_main.translation_service = TranslationService(
+        OfflineBackend(delay=translate_delay), cache_path=None
+    )
+    app_main.result_cache = ResultCache(
+        path=os.path.join(workdir, f"{run_name}-cache.sqlite"),
+        version=app_main.RESULT_CACHE_VERSION,
+    )
+    app_main.ocr_store = OcrStore(
+        os.path.join(workdir, f"{run_name}-ocr"), version=app_main.ocr_store.version
+    )
+    app_main.caption_engine = CaptionEngine(
+        device=app_main.DEVICE,
+        max_batch_size=caption_batch_size,
+        max_wait=CAPTION_MAX_WAIT if batching else 0,
+        quantized=app_main.USE_INT8,
+        backend=app_main.CAPTION_BACKEND,
+    )
+    if app_main.ocr_engine is not None:
+        app_main.ocr_engine = OcrEngine(
+            gpu=app_main.ocr_engine.gpu,
+            scheduler=app_main.ocr_scheduler,
+            max_images=app_main.ocr_engine.max_images,
+            max_wait=OCR_MAX_WAIT if batching else 0,
+        )
+
+
+def time_stages(image_files, workdir, translate_delay):
+    """Time each app_main stage function one image at a time"""
+    fresh_state(workdir, "stages", translate_delay, batching=False)
+    timings = {
+        "decode": [],
+        "extract_text_with_easyocr": [],
+        "translate_text": [],
+        "generate_caption": [],
+        "analyze_sentiment": [],
+    }
+
+    def timed(name, fn, *args):
+        start = time.perf_counter()
+        result = fn(*args)
+        timings[name].append(time.perf_counter() - start)
+        return result
+
+    rows = []
+    for path in image_files:
+        image = timed("decode", decode_image, path)
+        ocr_image, ocr_scale = app_main.ocr_profile.prepare(image)
+        text = timed(
+            "extract_text_with_easyocr",
+            app_main.extract_text_with_easyocr,
+            ocr_image,
+            ocr_scale,
+        )
+        translated = timed("translate_text", app_main.translate_text, text)
+        caption = timed("generate_caption", app_main.generate_caption, image)
+        timed("analyze_sentiment", app_main.analyze_sentiment, translated)
+        timed("analyze_sentiment", app_main.analyze_sentiment, caption)
+        rows.append(
+            {
+                "File Name": os.path.basename(path),
+                "Extracted Text": text,
+                "Translated Text": translated,
+                "Image Caption": caption,
+            }
+        )
+
+    excel_folder = os.path.join(workdir, "stage-excel")
+    os.makedirs(excel_folder, exist_ok=True)
+    start = time.perf_counter()
+    app_main.create_or_load_excel(excel_folder, pd.DataFrame(rows))
+    timings["create_or_load_excel"] = [time.perf_counter() - start]
+    return {name: summarize(seconds) for name, seconds in timings.items()}
+
+
+def clear_outputs(folder):
+    """Remove the workbook, part files and journal an earlier run left behind"""
+    output_folder = os.path.dirname(folder)
+    excel_file = app_main.results_excel_file(output_folder)
+    shutil.rmtree(excel_file + ".parts", ignore_errors=True)
+    for path in (
+        excel_file,
+        os.path.join(output_folder, "Sentiment_Analysis_Progress.sqlite"),
+    ):
+        if os.path.exists(path):
+            os.remove(path)
+
+
+def time_folder_runs(folder, count, workdir, workers, batch_sizes, translate_delay):
+    """End-to-end process_folder_parallel runs for every workers/batch pair"""
+    runs = []
+    for worker_count in workers:
+        for batch_size in batch_sizes:
+            app_main.STAGE_CONFIG["translate"]["workers"] = worker_count
+            app_main.STAGE_CONFIG["caption"]["workers"] = worker_count
+            run_name = f"w{worker_count}-b{batch_size}"
+            fresh_state(workdir, run_name, translate_delay, batch_size)
+            clear_outputs(folder)
+
+            start = time.perf_counter()
+            app_main.process_folder_parallel(folder)
+            seconds = time.perf_counter() - start
+            runs.append(
+                {
+                    "workers": worker_count,
+                    "caption_batch_size": batch_size,
+                    "seconds": round(seconds, 2),
+                    "memes_per_second": round(count / seconds, 3),
+                    "caption_batches": app_main.caption_engine.batches_run,
+                }
+            )
+            print(
+                f"workers={worker_count} batch={batch_size}: "
+                f"{count / seconds:.2f} memes/s"
+            )
+    return runs
+
+
+def environment():
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "device": app_main.DEVICE,
+        "torch": torch.__version__,
+        "gpu": torch.cuda.get_device_name(0) if app_main.DEVICE == "cuda" else None,
+        "ocr_processes": app_main.OCR_PROCESSES,
+        "ocr_profile": app_main.OCR_PROFILE,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--count", type=int, default=60, help="Synthetic memes")
+    parser.add_argument("--sizes", type=parse_sizes, default=DEFAULT_SIZES)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=parse_counts, default=[1, 4, 8])
+    parser.add_argument("--batch-sizes", type=parse_counts, default=[1, 8])
+    parser.add_argument(
+        "--translate-delay",
+        type=float,
+        default=0.0,
+        help="Seconds added to every stand-in translation call",
+    )
+    parser.add_argument("--skip-folder-runs", action="store_true")
+    parser.add_argument(
+        "--output",
+        default=f"pipeline_benchmark_{time.strftime('%Y%m%d-%H%M%S')}.json",
+        help="Where to write the JSON report",
+    )
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="meme_benchmark_")
+    try:
+        folder = os.path.join(workdir, "memes")
+        image_files = generate_memes(folder, args.count, args.sizes, args.seed)
+
+        report = {
+            "started": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "environment": environment(),
+            "config": {
+                "count": args.count,
+                "sizes": [list(size) for size in args.sizes],
+                "seed": args.seed,
+                "translate_delay": args.translate_delay,
+            },
+        }
+        # Load the models before anything is timed
+        app_main.generate_caption(decode_image(image_files[0]))
+        app_main.extract_text_with_easyocr(image_files[0])
+
+        report["stages"] = time_stages(image_files, workdir, args.translate_delay)
+        print(f"{'stage':<28} {'calls':>6} {'mean ms':>9} {'median ms':>10}")
+        for name, stats in report["stages"].items():
+            print(
+                f"{name:<28} {stats['calls']:>6} {stats['mean_ms']:>9.2f} "
+                f"{stats['median_ms']:>10.2f}"
+            )
+
+        if not args.skip_folder_runs:
+            report["folder_runs"] = time_folder_runs(
+                folder,
+                args.count,
+                workdir,
+                args.workers,
+                args.batch_sizes,
+                args.translate_delay,
+            )
+    finally:
+        if app_main.ocr_pool is not None:
+            app_main.ocr_pool.close()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    with open(args.output, "w", encoding="utf-8") as file:
+        json.dump(report, file, indent=2)
+    print(f"Report saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
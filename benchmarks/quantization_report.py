@@ -0,0 +1,120 @@
+"""
+Compares the fp32 and int8 dynamic-quantized BLIP and ideology models on the CPU:
+latency, memory added by loading each model, and how far the int8 outputs
+drift from the fp32 ones.
+
+Run from the repository root:
+    python -m benchmarks.quantization_report --images uploads --limit 100
+"""
+
+import argparse
+import json
+import time
+
+import pandas as pd
+import torch
+
+import model_registry
+from caption_engine import CaptionEngine
+from image_scanner import scan_images
+from sentiment_batch import polarity_scores, sentiment_labels
+
+IDEOLOGY_MODEL = "fine_tuned_model_for_PoliticalIdeology"
+DEFAULT_WORKBOOK = "Results/RQ1_and_RQ2/Sentiment_Analysis_Results.xlsx"
+
+
+def caption_run(image_files, quantized, batch_size):
+    engine = CaptionEngine(device="cpu", max_batch_size=batch_size, quantized=quantized)
+    handle = model_registry.get_blip("cpu", quantized)
+    start = time.perf_counter()
+    captions = engine.caption_many(image_files)
+    seconds = time.perf_counter() - start
+    return captions, seconds, handle.memory_bytes
+
+
+def classify_run(texts, quantized):
+    handle = model_registry.get_ideology_classifier(
+        IDEOLOGY_MODEL, "cpu", quantized=quantized
+    )
+    predictions = []
+    start = time.perf_counter()
+    with handle as (tokenizer, model):
+        for text in texts:
+            inputs = tokenizer(text, return_tensors="pt", truncation=True, padding=True)
+            with torch.no_grad():
+                predictions.append(model(**inputs).logits.argmax(dim=1).item())
+    seconds = time.perf_counter() - start
+    return predictions, seconds, handle.memory_bytes
+
+
+def megabytes(value):
+    return None if value is None else round(value / (1024 * 1024), 1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--images", default="uploads", help="Folder of sample memes")
+    parser.add_argument("--workbook", default=DEFAULT_WORKBOOK)
+    parser.add_argument("--limit", type=int, default=100)
+    parser.add_argument("--batch-size", type=int, default=8)
+    parser.add_argument("--skip-ideology", action="store_true")
+    parser.add_argument("--output", help="Also write the report to this JSON file")
+    args = parser.parse_args()
+
+    report = {}
+
+    image_files = sorted(scan_images(args.images, recursive=False))[: args.limit]
+    fp32_captions, fp32_seconds, fp32_memory = caption_run(
+        image_files, False, args.batch_size
+    )
+    int8_captions, int8_seconds, int8_memory = caption_run(
+        image_files, True, args.batch_size
+    )
+    fp32_labels = sentiment_labels([polarity_scores(c)[3] for c in fp32_captions])
+    int8_labels = sentiment_labels([polarity_scores(c)[3] for c in int8_captions])
+    report["blip"] = {
+        "images": len(image_files),
+        "fp32_ms_per_image": round(1000 * fp32_seconds / len(image_files), 1),
+        "int8_ms_per_image": round(1000 * int8_seconds / len(image_files), 1),
+        "fp32_memory_mb": megabytes(fp32_memory),
+        "int8_memory_mb": megabytes(int8_memory),
+        "identical_captions": sum(a == b for a, b in zip(fp32_captions, int8_captions))
+        / len(image_files),
+        "caption_sentiment_agreement": float((fp32_labels == int8_labels).mean()),
+    }
+
+    if not args.skip_ideology:
+        df = pd.read_excel(args.workbook, usecols=["Translated Text", "Image Caption"])
+        texts = (
+            (df["Translated Text"].fillna("") + " " + df["Image Caption"].fillna(""))
+            .str.strip()
+            .loc[lambda series: series != ""]
+            .head(args.limit)
+            .tolist()
+        )
+        fp32_predictions, fp32_seconds, fp32_memory = classify_run(texts, False)
+        int8_predictions, int8_seconds, int8_memory = classify_run(texts, True)
+        report["ideology"] = {
+            "texts": len(texts),
+            "fp32_ms_per_text": round(1000 * fp32_seconds / len(texts), 1),
+            "int8_ms_per_text": round(1000 * int8_seconds / len(texts), 1),
+            "fp32_memory_mb": megabytes(fp32_memory),
+            "int8_memory_mb": megabytes(int8_memory),
+            "prediction_agreement": sum(
+                a == b for a, b in zip(fp32_predictions, int8_predictions)
+            )
+            / len(texts),
+        }
+
+    for model, rows in report.items():
+        print(f"[{model}]")
+        for key, value in rows.items():
+            print(f"  {key:<28} {value}")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=2)
+        print(f"Report saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""
+Renders synthetic memes: English or Tagalog captions over random backgrounds.
+
+The same seed always produces the same images, so benchmark runs on
+different machines or commits see identical input. A manifest.json next to
+the images records the text drawn on each one.
+
+Run from the repository root:
+    python -m benchmarks.synthetic_memes --folder synthetic_memes --count 100
+"""
+
+import argparse
+import json
+import os
+import random
+
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont
+
+ENGLISH_LINES = [
+    "WHEN THE WIFI DROPS DURING THE EXAM",
+    "ME EXPLAINING MY PLANS TO MY WALLET",
+    "NOBODY: ABSOLUTELY NOBODY:",
+    "THAT FEELING WHEN IT IS FINALLY FRIDAY",
+    "I CAME, I SAW, I FORGOT WHY I CAME",
+    "TRUST THE PROCESS THEY SAID",
+    "VOTE WISELY THIS ELECTION",
+    "THE PRICE OF RICE AGAIN",
+]
+TAGALOG_LINES = [
+    "SANA ALL MAY JOWA",
+    "ANG HIRAP MAGING MAHIRAP",
+    "BAWAL MAGKASAKIT PAG WALANG PERA",
+    "KAPAG WALANG PASOK BUKAS",
+    "PANGAKO NILA NOONG ELEKSYON",
+    "TRAFFIC NA NAMAN SA EDSA",
+    "LODI KO TALAGA TO",
+    "MASAYA AKO PARA SA IYO PERO MAS MASAYA KUNG AKO",
+]
+DEFAULT_SIZES = [(320, 320), (800, 600), (1600, 1200)]
+FONT_CANDIDATES = ["DejaVuSans-Bold.ttf", "arialbd.ttf", "Arial Bold.ttf"]
+
+
+def load_font(size):
+    """A bold TrueType font when one is installed, else Pillow's default"""
+    for name in FONT_CANDIDATES:
+        try:
+            return ImageFont.truetype(name, size)
+        except OSError:
+            continue
+    return ImageFont.load_default(size=size)
+
+
+def random_background(rng, width, height):
+    """Noisy two-colour gradient, roughly like a photo behind the text"""
+    start = np.array([rng.randint(0, 255) for _ in range(3)], dtype=np.float32)
+    end = np.array([rng.randint(0, 255) for _ in range(3)], dtype=np.float32)
+    ramp = np.linspace(0, 1, height, dtype=np.float32)[:, None, None]
+    pixels = start + (end - start) * ramp
+    noise = np.random.default_rng(rng.randint(0, 2**31)).normal(
+        0, 18, (height, width, 3)
+    )
+    pixels = np.broadcast_to(pixels, (height, width, 3)) + noise
+    return Image.fromarray(np.clip(pixels, 0, 255).astype(np.uint8))
+
+
+def fitting_font(draw, text, width):
+    """Largest font (up to width / 14) whose rendering of `text` fits the width"""
+    size = max(12, width // 14)
+    while True:
+        font = load_font(size)
+        left, _, right, _ = draw.textbbox((0, 0), text, font=font)
+        if right - left <= width * 0.94 or size <= 10:
+            return font
+        size -= 2
+
+
+def draw_caption(draw, text, width, y):
+    """Centered white text with a black outline, the classic meme style"""
+    font = fitting_font(draw, text, width)
+    left, top, right, bottom = draw.textbbox((0, 0), text, font=font)
+    x = max(0, (width - (right - left)) // 2)
+    outline = max(1, font.size // 15)
+    draw.text(
+        (x, y), text, font=font, fill="white", stroke_width=outline, stroke_fill="black"
+    )
+
+
+def render_meme(rng, width, height, lines):
+    image = random_background(rng, width, height)
+    draw = ImageDraw.Draw(image)
+    margin = height // 20
+    draw_caption(draw, lines[0], width, margin)
+    if len(lines) > 1:
+        font = fitting_font(draw, lines[1], width)
+        draw_caption(draw, lines[1], width, height - margin - font.size * 1.3)
+    return image
+
+
+def generate_memes(folder, count, sizes=None, seed=0):
+    """
+    Write `count` synthetic memes into `folder` and return their paths.
+
+    Sizes are cycled through in order; half the memes use Tagalog captions.
+    """
+    sizes = sizes or DEFAULT_SIZES
+    rng = random.Random(seed)
+    os.makedirs(folder, exist_ok=True)
+    manifest = {}
+    paths = []
+    for index in range(count):
+        width, height = sizes[index % len(sizes)]
+        pool = TAGALOG_LINES if index % 2 else ENGLISH_LINES
+        lines = rng.sample(pool, 2 if rng.random() < 0.7 else 1)
+        name = f"synthetic_{index:05d}.jpg"
+        path = os.path.join(folder, name)
+        render_meme(rng, width, height, lines).save(path, quality=90)
+        manifest[name] = {
+            "text": " ".join(lines),
+            "language": "tl" if pool is TAGALOG_LINES else "en",
+            "size": [width, height],
+        }
+        paths.append(path)
+    with open(os.path.join(folder, "manifest.json"), "w", encoding="utf-8") as file:
+        json.dump(manifest, file, indent=2)
+    return paths
+
+
+def parse_sizes(value):
+    """'320x320,800x600' -> [(320, 320), (800, 600)]"""
+    return [tuple(int(side) for side in size.split("x")) for size in value.split(",")]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--folder", default="synthetic_memes")
+    parser.add_argument("--count", type=int, default=100)
+    parser.add_argument("--sizes", type=parse_sizes, default=DEFAULT_SIZES)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    paths = generate_memes(args.folder, args.count, args.sizes, args.seed)
+    print(f"Wrote {len(paths)} synthetic meme(s) to {args.folder}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Measures how often the text-presence check would wrongly skip OCR.
+
+Ground truth is the "Extracted Text" of the results workbook: an image has
+text when its OCR output there has at least --min-chars letters or digits.
+A false negative is an image with text that the check calls text-free; its
+text would be lost. The skip rate is the share of images that would not
+go through OCR at all. Both are reported for a range of --min-run values.
+
+Run from the repository root:
+    python -m benchmarks.text_presence_benchmark --images uploads --limit 2000
+"""
+
+import argparse
+import json
+import os
+import time
+
+import pandas as pd
+
+from image_decode import decode_image
+from text_presence import TextPresenceDetector
+
+DEFAULT_WORKBOOK = "Results/RQ1_and_RQ2/Sentiment_Analysis_Results.xlsx"
+
+
+def has_text(text, min_chars):
+    return sum(character.isalnum() for character in text) >= min_chars
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--images", default="uploads", help="Folder of sample memes")
+    parser.add_argument("--workbook", default=DEFAULT_WORKBOOK)
+    parser.add_argument("--limit", type=int, default=2000)
+    parser.add_argument("--min-chars", type=int, default=3)
+    parser.add_argument("--runs", default="1,2,3,4,6", help="min_run values to try")
+    parser.add_argument("--output", help="Also write the report to this JSON file")
+    args = parser.parse_args()
+
+    df = pd.read_excel(args.workbook, usecols=["File Name", "Extracted Text"])
+    truth = {
+        str(name): has_text(str(text), args.min_chars)
+        for name, text in zip(df["File Name"], df["Extracted Text"].fillna(""))
+    }
+    names = sorted(
+        name for name in truth if os.path.exists(os.path.join(args.images, name))
+    )[: args.limit]
+    if not names:
+        print(f"No images from '{args.workbook}' found in '{args.images}'.")
+        return
+
+    detector = TextPresenceDetector()
+    scores = []
+    seconds = 0.0
+    for name in names:
+        image = decode_image(os.path.join(args.images, name))
+        start = time.perf_counter()
+        scores.append(detector.score(image))
+        seconds += time.perf_counter() - start
+
+    with_text = sum(truth[name] for name in names)
+    report = {
+        "images": len(names),
+        "with_text": with_text,
+        "ms_per_image": round(1000 * seconds / len(names), 2),
+        "min_run": {},
+    }
+    for min_run in (int(value) for value in args.runs.split(",")):
+        skipped = [score < min_run for score in scores]
+        false_negatives = sum(
+            skip and truth[name] for skip, name in zip(skipped, names)
+        )
+        report["min_run"][min_run] = {
+            "skip_rate": round(sum(skipped) / len(names), 4),
+            "false_negatives": false_negatives,
+            "false_negative_rate": (
+                round(false_negatives / with_text, 4) if with_text else 0.0
+            ),
+        }
+
+    print(
+        f"{len(names)} image(s), {with_text} with text in the workbook; "
+        f"{report['ms_per_image']:.2f} ms per check"
+    )
+    print(f"{'min_run':>8} {'skipped':>9} {'missed text':>12} {'FN rate':>9}")
+    for min_run, rows in report["min_run"].items():
+        marker = " (default)" if min_run == detector.min_run else ""
+        print(
+            f"{min_run:>8} {rows['skip_rate']:>9.2%} {rows['false_negatives']:>12} "
+            f"{rows['false_negative_rate']:>9.2%}{marker}"
+        )
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=2)
+        print(f"Report saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Compares translation throughput of the old per-call Google approach with the
+offline Marian backend, one text at a time and batched.
+
+Run from the repository root:
+    python -m benchmarks.translation_benchmark --limit 200
+    python -m benchmarks.translation_benchmark --limit 200 --with-google
+"""
+
+import argparse
+import time
+
+import pandas as pd
+
+from translation import MarianBackend, TranslationService
+
+DEFAULT_WORKBOOK = "Results/RQ1_and_RQ2/Sentiment_Analysis_Results.xlsx"
+
+
+def load_texts(workbook, limit):
+    """Load non-empty OCR texts from a results workbook"""
+    df = pd.read_excel(workbook, usecols=["Extracted Text"])
+    texts = df["Extracted Text"].dropna().astype(str)
+    texts = texts[texts.str.strip() != ""]
+    return texts.head(limit).tolist()
+
+
+def google_per_call(texts):
+    """The original approach: a new Translator and one request per text"""
+    from googletrans import Translator
+
+    for text in texts:
+        try:
+            Translator().translate(text, dest="en")
+        except Exception as e:
+            print(f"Error during translation: {e}")
+
+
+def marian_per_call(texts, model_path):
+    backend = MarianBackend(model_path=model_path, batch_size=1)
+    for text in texts:
+        backend.translate_batch([text])
+
+
+def marian_batched(texts, model_path, batch_size):
+    # No cache, so every text really goes through the model
+    service = TranslationService(
+        MarianBackend(model_path=model_path, batch_size=batch_size),
+        cache_path=None,
+        max_batch_size=len(texts),
+        max_concurrency=1,
+    )
+    service.translate_batch(texts)
+
+
+def timed(label, fn, count):
+    start = time.perf_counter()
+    fn()
+    seconds = time.perf_counter() - start
+    print(f"{label:<32} {seconds:8.2f}s {count / seconds:8.2f} texts/s")
+    return seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--workbook", default=DEFAULT_WORKBOOK)
+    parser.add_argument("--limit", type=int, default=200)
+    parser.add_argument("--batch-size", type=int, default=16)
+    parser.add_argument("--model-path", default=MarianBackend().model_path)
+    parser.add_argument(
+        "--with-google",
+        action="store_true",
+        help="Also time the per-call Google approach (needs network access)",
+    )
+    args = parser.parse_args()
+
+    texts = load_texts(args.workbook, args.limit)
+    print(f"Translating {len(texts)} texts from {args.workbook}")
+
+    # Load the model before timing so only inference is measured
+    marian_per_call(texts[:1], args.model_path)
+
+    if args.with_google:
+        timed("google, one call per text", lambda: google_per_call(texts), len(texts))
+    timed(
+        "marian, one text per call",
+        lambda: marian_per_call(texts, args.model_path),
+        len(texts),
+    )
+    timed(
+        f"marian, batches of {args.batch_size}",
+        lambda: marian_batched(texts, args.model_path, args.batch_size),
+        len(texts),
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,315 @@
+"""
+Exports BLIP captioning to ONNX and runs it on the CPU with onnxruntime.
+
+The model is split into two graphs: the vision encoder, and one step of the
+text decoder that takes and returns the self-attention key/value cache, so
+every generated token costs a single-token decoder pass. The runtime keeps
+both sessions open for the life of the process and decodes greedily.
+
+    python blip_onnx.py export                  # writes ./blip_onnx
+    python blip_onnx.py check --images uploads  # eager vs ONNX parity
+"""
+
+import argparse
+import glob
+import json
+import os
+
+import numpy as np
+
+from model_registry import BLIP_MODEL_NAME
+
+DEFAULT_EXPORT_DIR = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "blip_onnx"
+)
+VISION_FILE = "vision_encoder.onnx"
+DECODER_FILE = "text_decoder_step.onnx"
+CONFIG_FILE = "blip_onnx.json"
+
+
+def _optimized(path):
+    return path.replace(".onnx", ".opt.onnx")
+
+
+def export(output_dir=DEFAULT_EXPORT_DIR, model_name=BLIP_MODEL_NAME, opset=17):
+    """
+    Export the vision encoder and the cached decoder step of a BLIP model.
+
+    The processor is saved next to the graphs, so the runtime needs nothing
+    but `output_dir`. Each graph is also saved after onnxruntime's offline
+    graph optimizations, which is what the runtime loads.
+    """
+    import torch
+    from transformers import BlipForConditionalGeneration, BlipProcessor
+
+    processor = BlipProcessor.from_pretrained(model_name)
+    model = BlipForConditionalGeneration.from_pretrained(model_name).eval()
+    text_config = model.config.text_config
+    num_layers = text_config.num_hidden_layers
+    num_heads = text_config.num_attention_heads
+    head_dim = text_config.hidden_size // num_heads
+
+    class VisionEncoder(torch.nn.Module):
+        def __init__(self):
+            super().__init__()
+            self.vision_model = model.vision_model
+
+        def forward(self, pixel_values):
+            return self.vision_model(pixel_values=pixel_values)[0]
+
+    class TextDecoderStep(torch.nn.Module):
+        def __init__(self):
+            super().__init__()
+            self.text_decoder = model.text_decoder
+
+        def forward(self, input_ids, attention_mask, encoder_hidden_states, *past):
+            past_key_values = tuple(
+                (past[2 * i], past[2 * i + 1]) for i in range(num_layers)
+            )
+            outputs = self.text_decoder(
+                input_ids=input_ids,
+                attention_mask=attention_mask,
+                encoder_hidden_states=encoder_hidden_states,
+                past_key_values=past_key_values,
+                use_cache=True,
+                return_dict=True,
+            )
+            present = [tensor for layer in outputs.past_key_values for tensor in layer]
+            return (outputs.logits[:, -1, :], *present)
+
+    os.makedirs(output_dir, exist_ok=True)
+    image_size = processor.image_processor.size["height"]
+    pixel_values = torch.randn(2, 3, image_size, image_size)
+    vision_path = os.path.join(output_dir, VISION_FILE)
+    with torch.no_grad():
+        torch.onnx.export(
+            VisionEncoder(),
+            (pixel_values,),
+            vision_path,
+            input_names=["pixel_values"],
+            output_names=["image_embeds"],
+            dynamic_axes={"pixel_values": {0: "batch"}, "image_embeds": {0: "batch"}},
+            opset_version=opset,
+        )
+        image_embeds = VisionEncoder()(pixel_values)
+
+    # Trace with a non-empty cache; at run time the first step gets an empty one
+    past_length = 3
+    past = [
+        torch.randn(2, num_heads, past_length, head_dim) for _ in range(2 * num_layers)
+    ]
+    past_names = [f"past_{i}" for i in range(2 * num_layers)]
+    present_names = [f"present_{i}" for i in range(2 * num_layers)]
+    dynamic_axes = {
+        "input_ids": {0: "batch"},
+        "attention_mask": {0: "batch", 1: "total_length"},
+        "encoder_hidden_states": {0: "batch"},
+        "logits": {0: "batch"},
+    }
+    dynamic_axes.update({name: {0: "batch", 2: "past_length"} for name in past_names})
+    dynamic_axes.update(
+        {name: {0: "batch", 2: "total_length"} for name in present_names}
+    )
+    decoder_path = os.path.join(output_dir, DECODER_FILE)
+    with torch.no_grad():
+        torch.onnx.export(
+            TextDecoderStep(),
+            (
+                torch.full((2, 1), text_config.bos_token_id, dtype=torch.long),
+                torch.ones(2, past_length + 1, dtype=torch.long),
+                image_embeds,
+                *past,
+            ),
+            decoder_path,
+            input_names=["input_ids", "attention_mask", "encoder_hidden_states"]
+            + past_names,
+            output_names=["logits"] + present_names,
+            dynamic_axes=dynamic_axes,
+            opset_version=opset,
+        )
+
+    processor.save_pretrained(output_dir)
+    with open(os.path.join(output_dir, CONFIG_FILE), "w", encoding="utf-8") as file:
+        json.dump(
+            {
+                "model_name": model_name,
+                "bos_token_id": text_config.bos_token_id,
+                "eos_token_id": text_config.sep_token_id,
+                "pad_token_id": text_config.pad_token_id,
+                "num_layers": num_layers,
+                "num_heads": num_heads,
+                "head_dim": head_dim,
+            },
+            file,
+            indent=2,
+        )
+
+    import onnxruntime as ort
+
+    for path in (vision_path, decoder_path):
+        options = ort.SessionOptions()
+        # Extended (not "all") optimizations stay portable across CPUs
+        options.graph_optimization_level = (
+            ort.GraphOptimizationLevel.ORT_ENABLE_EXTENDED
+        )
+        options.optimized_model_filepath = _optimized(path)
+        ort.InferenceSession(path, options, providers=["CPUExecutionProvider"])
+    print(f"Exported {model_name} to {output_dir}")
+
+
+class OnnxBlipCaptioner:
+    """
+    Greedy BLIP captioning from an exported model, on the CPU.
+
+    Args:
+        export_dir (str): Folder written by `export()`.
+        threads (int): onnxruntime intra-op threads; the library picks when None.
+    """
+
+    def __init__(self, export_dir=DEFAULT_EXPORT_DIR, threads=None):
+        try:
+            import onnxruntime as ort
+        except ImportError:
+            raise ImportError(
+                "The ONNX caption backend needs onnxruntime: pip install onnxruntime"
+            )
+        from transformers import BlipProcessor
+
+        with open(os.path.join(export_dir, CONFIG_FILE), encoding="utf-8") as file:
+            self.config = json.load(file)
+        self.processor = BlipProcessor.from_pretrained(export_dir)
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if threads:
+            options.intra_op_num_threads = threads
+
+        def session(file_name):
+            path = os.path.join(export_dir, file_name)
+            if os.path.exists(_optimized(path)):
+                path = _optimized(path)
+            return ort.InferenceSession(
+                path, options, providers=["CPUExecutionProvider"]
+            )
+
+        self.vision = session(VISION_FILE)
+        self.decoder = session(DECODER_FILE)
+
+    def generate(self, images, max_new_tokens=24, num_beams=1, **unused):
+        """Caption a list of RGB PIL images; only greedy decoding is supported"""
+        if num_beams != 1:
+            raise ValueError("The ONNX caption backend only does greedy decoding")
+        config = self.config
+        pixel_values = self.processor(images=images, return_tensors="np")[
+            "pixel_values"
+        ].astype(np.float32)
+        (image_embeds,) = self.vision.run(None, {"pixel_values": pixel_values})
+
+        batch = len(images)
+        past = [
+            np.zeros((batch, config["num_heads"], 0, config["head_dim"]), np.float32)
+            for _ in range(2 * config["num_layers"])
+        ]
+        next_ids = np.full(batch, config["bos_token_id"], dtype=np.int64)
+        finished = np.zeros(batch, dtype=bool)
+        generated = []
+        for step in range(max_new_tokens):
+            feeds = {
+                "input_ids": next_ids[:, None],
+                "attention_mask": np.ones((batch, step + 1), dtype=np.int64),
+                "encoder_hidden_states": image_embeds,
+            }
+            feeds.update({f"past_{i}": tensor for i, tensor in enumerate(past)})
+            logits, *past = self.decoder.run(None, feeds)
+            next_ids = np.where(
+                finished, config["pad_token_id"], logits.argmax(axis=-1)
+            ).astype(np.int64)
+            generated.append(next_ids)
+            finished |= next_ids == config["eos_token_id"]
+            if finished.all():
+                break
+        return self.processor.batch_decode(
+            np.stack(generated, axis=1), skip_special_tokens=True
+        )
+
+
+def check_parity(images, export_dir=DEFAULT_EXPORT_DIR, max_new_tokens=24):
+    """
+    Compare eager PyTorch and ONNX captions and image embeddings on CPU.
+
+    Returns:
+        dict: Largest embedding difference and the share of identical captions.
+    """
+    import torch
+    from transformers import BlipForConditionalGeneration
+
+    from caption_engine import to_rgb_image
+
+    images = [to_rgb_image(image) for image in images]
+    captioner = OnnxBlipCaptioner(export_dir)
+    model = BlipForConditionalGeneration.from_pretrained(
+        captioner.config["model_name"]
+    ).eval()
+    inputs = captioner.processor(images=images, return_tensors="pt")
+    with torch.no_grad():
+        eager_embeds = model.vision_model(pixel_values=inputs["pixel_values"])[0]
+        eager_ids = model.generate(**inputs, num_beams=1, max_new_tokens=max_new_tokens)
+    eager = captioner.processor.batch_decode(eager_ids, skip_special_tokens=True)
+    (onnx_embeds,) = captioner.vision.run(
+        None, {"pixel_values": inputs["pixel_values"].numpy()}
+    )
+    onnx = captioner.generate(images, max_new_tokens=max_new_tokens)
+
+    mismatches = [
+        (index, a, b) for index, (a, b) in enumerate(zip(eager, onnx)) if a != b
+    ]
+    for index, a, b in mismatches:
+        print(f"  image {index}: eager '{a}' vs onnx '{b}'")
+    return {
+        "images": len(images),
+        "max_embedding_difference": float(
+            np.abs(eager_embeds.numpy() - onnx_embeds).max()
+        ),
+        "identical_captions": 1 - len(mismatches) / len(images),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("command", choices=["export", "check"])
+    parser.add_argument("--output", default=DEFAULT_EXPORT_DIR, help="Export folder")
+    parser.add_argument("--opset", type=int, default=17)
+    parser.add_argument("--images", default="uploads", help="Images for the check")
+    parser.add_argument("--limit", type=int, default=16)
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=1e-3,
+        help="Largest embedding difference the check accepts",
+    )
+    args = parser.parse_args()
+
+    if args.command == "export":
+        export(args.output, opset=args.opset)
+        return
+
+    image_files = sorted(
+        path
+        for path in glob.glob(os.path.join(args.images, "*"))
+        if path.lower().endswith((".jpg", ".jpeg", ".png"))
+    )[: args.limit]
+    if not image_files:
+        print(f"No images found in '{args.images}'.")
+        return
+    result = check_parity(image_files, args.output)
+    print(json.dumps(result, indent=2))
+    if (
+        result["max_embedding_difference"] > args.tolerance
+        or result["identical_captions"] < 1
+    ):
+        raise SystemExit("Parity check failed")
+    print("Parity check passed")
+
+
+if __name__ == "__main__":
+    main()
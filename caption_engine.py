@@ -0,0 +1,203 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+import numpy as np
+import torch
+from PIL import Image
+
+import devices
+import model_registry
+from batch_scheduler import BatchScheduler
+from image_decode import decode_for_caption
+
+# Generation settings per caption profile. Every profile caps the caption
+# length, so the decode cost per image is bounded. "balanced" decodes greedily
+# like the existing results, but the original `generate` call stopped at the
+# default max_length of 20 tokens, so captions longer than that can differ.
+CAPTION_PROFILES = {
+    "fast": {"num_beams": 1, "max_new_tokens": 12},
+    "balanced": {"num_beams": 1, "max_new_tokens": 24},
+    "beam": {"num_beams": 4, "max_new_tokens": 32, "early_stopping": True},
+}
+DEFAULT_CAPTION_PROFILE = "balanced"
+
+# "torch" runs BLIP eagerly on the engine's device; "onnx" runs the graphs
+# written by `python blip_onnx.py export` on the CPU
+CAPTION_BACKENDS = ("torch", "onnx")
+
+
+def get_caption_profile(name):
+    """Generation keyword arguments of a caption profile"""
+    if name not in CAPTION_PROFILES:
+        raise ValueError(
+            f"Unknown caption profile '{name}'. "
+            f"Choose from: {', '.join(CAPTION_PROFILES)}"
+        )
+    return CAPTION_PROFILES[name]
+
+
+def to_rgb_image(image):
+    """Turn a file path, bytes, numpy array or PIL image into an RGB PIL image"""
+    if isinstance(image, Image.Image):
+        return image if image.mode == "RGB" else image.convert("RGB")
+    if not isinstance(image, np.ndarray):
+        # Only the caption needs this decode, so BLIP's resolution is enough
+        image = decode_for_caption(image)
+    return Image.fromarray(image).convert("RGB")
+
+
+class CaptionEngine:
+    """
+    Groups caption requests from any number of threads into BLIP batches.
+
+    Callers submit images and get futures back; a single background thread
+    collects up to `max_batch_size` images (waiting at most `max_wait`
+    seconds for the batch to fill) and runs one `generate` call per batch.
+    A BatchScheduler splits a batch further if it runs out of memory.
+    Requests for different caption profiles are batched separately.
+
+    The ONNX backend only decodes greedily, so beam-search profiles still go
+    through the eager PyTorch model, on the CPU.
+
+    Args:
+        device (str): Torch device the BLIP model runs on.
+        quantized (bool): Use the int8 dynamic-quantized BLIP model (CPU only).
+        max_batch_size (int): Largest number of images per `generate` call.
+        max_wait (float): Seconds to wait for more images before running a
+            partial batch.
+        profile (str): Caption profile used when a request does not name one.
+        backend (str): "torch" or "onnx"; "onnx" always runs on the CPU.
+        onnx_dir (str): Export folder for the ONNX backend; defaults to the
+            folder `blip_onnx.py export` writes.
+    """
+
+    def __init__(
+        self,
+        device="cuda",
+        max_batch_size=8,
+        max_wait=0.05,
+        quantized=False,
+        profile=DEFAULT_CAPTION_PROFILE,
+        backend="torch",
+        onnx_dir=None,
+    ):
+        get_caption_profile(profile)
+        if backend not in CAPTION_BACKENDS:
+            raise ValueError(
+                f"Unknown caption backend '{backend}'. "
+                f"Choose from: {', '.join(CAPTION_BACKENDS)}"
+            )
+        if backend == "onnx":
+            device = "cpu"
+        self.backend = backend
+        self.onnx_dir = onnx_dir
+        self.device = device
+        self.quantized = quantized
+        self.profile = profile
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.scheduler = BatchScheduler("Captioning", device, max_batch_size)
+        self.batches_run = 0
+        self.images_captioned = 0
+        self._queue = queue.Queue()
+        self._worker = None
+        self._start_lock = threading.Lock()
+
+    def _ensure_started(self):
+        if self._worker is not None:
+            return
+        with self._start_lock:
+            if self._worker is None:
+                self._worker = threading.Thread(
+                    target=self._run, name="caption-engine", daemon=True
+                )
+                self._worker.start()
+
+    def _next_batch(self):
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            groups = {}
+            for image, profile, future in self._next_batch():
+                if not future.set_running_or_notify_cancel():
+                    continue
+                try:
+                    image = to_rgb_image(image)
+                except Exception as e:
+                    future.set_exception(e)
+                    continue
+                images, futures = groups.setdefault(profile, ([], []))
+                images.append(image)
+                futures.append(future)
+            for profile, (images, futures) in groups.items():
+                try:
+                    captions = self.generate(images, profile)
+                except Exception:
+                    self._generate_each(images, futures, profile)
+                    continue
+                for future, caption in zip(futures, captions):
+                    future.set_result(caption)
+
+    def _generate_each(self, images, futures, profile):
+        """Retry a failed batch one image at a time, so only the bad image fails"""
+        for image, future in zip(images, futures):
+            try:
+                future.set_result(self.generate([image], profile)[0])
+            except Exception as e:
+                future.set_exception(e)
+
+    def generate(self, images, profile=None):
+        """Caption a list of RGB PIL images, in as few batches as memory allows"""
+        settings = get_caption_profile(profile or self.profile)
+        return self.scheduler.map(
+            images, lambda batch: self._generate_batch(batch, settings)
+        )
+
+    def _generate_batch(self, images, settings):
+        """One `generate` call over a list of RGB PIL images"""
+        if self.backend == "onnx" and settings["num_beams"] == 1:
+            with model_registry.get_blip_onnx(self.onnx_dir) as captioner:
+                captions = captioner.generate(images, **settings)
+            self.batches_run += 1
+            self.images_captioned += len(images)
+            return captions
+        handle = model_registry.get_blip(self.device, self.quantized)
+        with handle as (processor, model):
+            inputs = processor(images=images, return_tensors="pt").to(self.device)
+            with torch.no_grad(), devices.autocast(self.device):
+                out = model.generate(**inputs, **settings)
+            captions = processor.batch_decode(out, skip_special_tokens=True)
+        self.batches_run += 1
+        self.images_captioned += len(images)
+        return captions
+
+    def submit(self, image, profile=None):
+        """Queue an image (path, bytes, array or PIL image) and return a Future"""
+        profile = profile or self.profile
+        get_caption_profile(profile)
+        self._ensure_started()
+        future = Future()
+        self._queue.put((image, profile, future))
+        return future
+
+    def caption(self, image, profile=None):
+        """Caption one image, sharing a batch with any concurrent callers"""
+        return self.submit(image, profile).result()
+
+    def caption_many(self, images, profile=None):
+        """Caption a stream of images and return the captions in input order"""
+        futures = [self.submit(image, profile) for image in images]
+        return [future.result() for future in futures]
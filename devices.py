@@ -0,0 +1,101 @@
+import contextlib
+import os
+
+import torch
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+QUANTIZED_CACHE_DIR = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "quantized_models"
+)
+
+
+def pick_device(preferred=None):
+    """
+    Return the torch device name to run on.
+
+    Uses `preferred` when given ("cpu" or "cuda"), otherwise CUDA when it is
+    available and the CPU when it is not.
+    """
+    if preferred == "cuda" and not torch.cuda.is_available():
+        print("Warning: CUDA is not available. Running on CPU.")
+        return "cpu"
+    if preferred:
+        return preferred
+    return "cuda" if torch.cuda.is_available() else "cpu"
+
+
+def autocast(device):
+    """Mixed precision on CUDA; a no-op context on the CPU"""
+    if device.startswith("cuda"):
+        return torch.amp.autocast("cuda")
+    return contextlib.nullcontext()
+
+
+def set_threads(count):
+    """Limit torch's intra-op thread pool in this process"""
+    torch.set_num_threads(max(1, count))
+
+
+def empty_cache(device):
+    """Release cached GPU memory; nothing to do on the CPU"""
+    if device.startswith("cuda"):
+        torch.cuda.empty_cache()
+
+
+def available_memory(device):
+    """Free bytes on the GPU, or available RAM on the CPU; None if unknown"""
+    if device.startswith("cuda"):
+        free, _ = torch.cuda.mem_get_info()
+        return free
+    if psutil is not None:
+        return psutil.virtual_memory().available
+    return None
+
+
+def is_out_of_memory(error):
+    """True for CUDA OOM errors and failed CPU allocations"""
+    if isinstance(error, (torch.cuda.OutOfMemoryError, MemoryError)):
+        return True
+    # The CPU allocator reports failures as a plain RuntimeError
+    message = str(error).lower()
+    return isinstance(error, RuntimeError) and (
+        "out of memory" in message or "can't allocate memory" in message
+    )
+
+
+def quantize_dynamic(model):
+    """int8 dynamic quantization of every Linear layer, for CPU inference"""
+    model.eval()
+    return torch.ao.quantization.quantize_dynamic(
+        model, {torch.nn.Linear}, dtype=torch.qint8
+    )
+
+
+def load_quantized(name, build_model, cache_dir=QUANTIZED_CACHE_DIR):
+    """
+    Return an int8 dynamic-quantized model, building it only once.
+
+    The first call builds the fp32 model with `build_model`, quantizes it and
+    saves it under `cache_dir`; later calls (and later runs) load the saved
+    copy directly.
+
+    Args:
+        name (str): File name stem of the cached model.
+        build_model (callable): Returns the fp32 model on the CPU.
+        cache_dir (str): Folder the quantized models are saved in.
+    """
+    path = os.path.join(cache_dir, f"{name}-int8.pt")
+    if os.path.exists(path):
+        model = torch.load(path, weights_only=False)
+        model.eval()
+        return model
+
+    model = quantize_dynamic(build_model())
+    os.makedirs(cache_dir, exist_ok=True)
+    torch.save(model, path)
+    print(f"Saved int8 model to {path}")
+    return model
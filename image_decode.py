@@ -0,0 +1,36 @@
+import io
+
+import numpy as np
+from PIL import Image
+
+# BLIP resizes every image to this square before encoding it
+BLIP_INPUT_SIZE = 384
+
+
+def decode_image(data, min_size=None):
+    """
+    Decode image bytes (or a file path) once into an RGB uint8 array.
+
+    The array can be handed to both EasyOCR and the caption engine, so the
+    file is neither read nor decoded a second time.
+
+    Args:
+        data (bytes | str): Encoded image bytes, or a path to the image.
+        min_size (int): When set, JPEGs are decoded at a reduced scale using
+            Pillow's draft mode, keeping both sides at least this large. Only
+            use this when the consumer does not need full resolution (e.g.
+            captioning alone), since OCR needs the full-size text.
+    """
+    source = io.BytesIO(data) if isinstance(data, (bytes, bytearray)) else data
+    with Image.open(source) as image:
+        if min_size and image.format == "JPEG":
+            # draft() picks the smallest 1/2, 1/4 or 1/8 scale that still
+            # covers the requested size, which skips most of the IDCT work
+            scale = max(1, min(image.size) // min_size)
+            image.draft("RGB", (image.size[0] // scale, image.size[1] // scale))
+        return np.asarray(image.convert("RGB"))
+
+
+def decode_for_caption(data):
+    """Decode at roughly BLIP's input resolution, for caption-only consumers"""
+    return decode_image(data, min_size=BLIP_INPUT_SIZE)
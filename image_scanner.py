@@ -0,0 +1,76 @@
+import os
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".gif", ".bmp", ".webp")
+
+# Leading bytes of each supported format
+MAGIC_NUMBERS = (
+    b"\xff\xd8\xff",  # JPEG
+    b"\x89PNG\r\n\x1a\n",  # PNG
+    b"GIF87a",
+    b"GIF89a",
+    b"BM",  # BMP
+)
+
+
+def has_image_magic(path):
+    """True if the file starts with the signature of a supported image format"""
+    try:
+        with open(path, "rb") as file:
+            header = file.read(12)
+    except OSError:
+        return False
+    if header[:4] == b"RIFF" and header[8:12] == b"WEBP":
+        return True
+    return header.startswith(MAGIC_NUMBERS)
+
+
+def scan_images(
+    folder_path,
+    extensions=IMAGE_EXTENSIONS,
+    recursive=True,
+    check_magic=False,
+):
+    """
+    Yield the paths of image files under a folder as they are found.
+
+    Built on os.scandir, so paths are produced while the directory is still
+    being read and nothing is held in memory besides the folders waiting to
+    be visited. Sub-folders (e.g. Batch1..N) are walked depth-first;
+    symlinked folders are not followed.
+
+    Args:
+        folder_path (str): Folder to scan.
+        extensions (tuple): Lower-case file extensions to accept.
+        recursive (bool): Descend into sub-folders.
+        check_magic (bool): Also open each file and check its leading bytes,
+            skipping files that are not really images.
+    """
+    pending = [folder_path]
+    while pending:
+        folder = pending.pop()
+        try:
+            entries = os.scandir(folder)
+        except OSError as e:
+            print(f"Skipping unreadable folder {folder}: {e}")
+            continue
+        with entries:
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        if recursive:
+                            pending.append(entry.path)
+                        continue
+                    if not entry.is_file():
+                        continue
+                except OSError:
+                    continue
+                if not entry.name.lower().endswith(extensions):
+                    continue
+                if check_magic and not has_image_magic(entry.path):
+                    continue
+                yield entry.path
+
+
+def count_images(folder_path, **kwargs):
+    """Number of files scan_images would yield, without keeping the paths"""
+    return sum(1 for _ in scan_images(folder_path, **kwargs))
@@ -1,11 +1,15 @@
 import os
 from PIL import Image
 
+from image_scanner import scan_images
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".gif", ".bmp")
+
 
 def validate_and_remove_images(folder_path):
     """
-    Validates images in the given folder, removes corrupted ones,
-    and reports the number of corrupted and removed images.
+    Validates images in the given folder and its sub-folders, removes
+    corrupted ones, and reports the number of corrupted and removed images.
 
     Args:
         folder_path (str): Path to the folder containing images.
@@ -14,17 +18,10 @@ def validate_and_remove_images(folder_path):
     total_images = 0
 
     try:
-        # Get a list of all image files in the folder
-        image_files = [
-            f
-            for f in os.listdir(folder_path)
-            if f.lower().endswith((".jpg", ".jpeg", ".png", ".gif", ".bmp"))
-        ]
-
-        total_images = len(image_files)
-
-        for file_name in image_files:
-            file_path = os.path.join(folder_path, file_name)
+        # Check the images as they are found instead of listing the folder first
+        for file_path in scan_images(folder_path, extensions=IMAGE_EXTENSIONS):
+            total_images += 1
+            file_name = os.path.relpath(file_path, folder_path)
             try:
                 # Attempt to open and verify the image
                 with Image.open(file_path) as img:
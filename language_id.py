@@ -0,0 +1,66 @@
+import re
+
+# Frequent function words; words shared by both languages ("at", "may") are
+# left out of the Tagalog list so they count as English
+ENGLISH_WORDS = {
+    "the", "a", "an", "and", "or", "but", "of", "to", "in", "on", "at", "for",
+    "with", "from", "by", "is", "are", "was", "were", "be", "been", "am", "i",
+    "you", "he", "she", "it", "we", "they", "me", "him", "her", "us", "them",
+    "my", "your", "his", "our", "their", "this", "that", "these", "those",
+    "what", "who", "when", "where", "why", "how", "not", "no", "yes", "do",
+    "does", "did", "have", "has", "had", "will", "would", "can", "could",
+    "should", "just", "so", "if", "then", "than", "there", "here", "all",
+    "get", "got", "like", "one", "more", "about", "out", "up", "now",
+}  # fmt: skip
+
+TAGALOG_WORDS = {
+    "ang", "ng", "mga", "sa", "na", "nang", "ay", "si", "ni", "kay",
+    "ko", "mo", "ka", "ako", "ikaw", "siya", "kami", "tayo", "kayo", "sila",
+    "niya", "namin", "natin", "ninyo", "nila", "akin", "iyo", "kanya", "ito",
+    "iyan", "iyon", "dito", "diyan", "doon", "hindi", "huwag", "wala",
+    "mayroon", "oo", "po", "opo", "lang", "lamang", "din", "rin", "daw", "raw",
+    "pa", "ba", "naman", "kasi", "pero", "kung", "kapag", "pag", "para",
+    "dahil", "bakit", "ano", "sino", "saan", "kailan", "paano", "ganito",
+    "ganyan", "talaga", "yung", "yun", "nga", "eh", "sana", "tapos", "lahat",
+    "kayong", "mong", "kong", "nyo", "pala", "kaya", "muna",
+}  # fmt: skip
+
+# Tagalog verb and adjective prefixes, e.g. nagsabi, nakakatawa, pinakamahal
+TAGALOG_AFFIXES = re.compile(r"^(nag|mag|nakaka|naka|maka|ipa|pinaka|pina)\w{3,}$")
+
+WORD_PATTERN = re.compile(r"[^\W\d_]+")
+
+
+def word_counts(text):
+    """Return the (english, tagalog) evidence found in `text`"""
+    english = 0
+    tagalog = 0
+    for word in WORD_PATTERN.findall(text.lower()):
+        if word in TAGALOG_WORDS:
+            tagalog += 1
+        elif word in ENGLISH_WORDS:
+            english += 1
+        elif TAGALOG_AFFIXES.match(word):
+            # Affixes are weaker evidence than a known function word
+            tagalog += 0.5
+    return english, tagalog
+
+
+def tagalog_ratio(text):
+    """Return the share of recognised words in `text` that look Tagalog"""
+    english, tagalog = word_counts(text)
+    total = english + tagalog
+    return tagalog / total if total else 0.0
+
+
+def is_english(text, threshold=0.3):
+    """
+    Guess whether a sentence is English and can skip translation.
+
+    Only sentences with at least one English function word are skipped.
+    Sentences without any recognised word are left for translation, since
+    they are often Tagalog content words alone ("Mahal kita", "Salamat")
+    that the sentiment scorer cannot read untranslated.
+    """
+    english, tagalog = word_counts(text)
+    return english > 0 and tagalog / (english + tagalog) < threshold
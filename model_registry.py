@@ -0,0 +1,246 @@
+import os
+import sys
+import threading
+import time
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+BLIP_MODEL_NAME = "Salesforce/blip-image-captioning-base"
+MARIAN_MODEL_NAME = "Helsinki-NLP/opus-mt-tl-en"
+OCR_LANGUAGES = ["en", "tl"]
+
+# name -> function that builds the model, and name -> loaded ModelHandle
+_loaders = {}
+_handles = {}
+_load_locks = {}
+_registry_lock = threading.Lock()
+
+
+class ModelHandle:
+    """A loaded model plus the lock that serializes calls into it"""
+
+    def __init__(self, name, model, load_seconds, memory_bytes):
+        self.name = name
+        self.model = model
+        self.lock = threading.RLock()
+        self.load_seconds = load_seconds
+        self.memory_bytes = memory_bytes
+
+    def __enter__(self):
+        self.lock.acquire()
+        return self.model
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.lock.release()
+
+
+def resident_memory():
+    """Return the resident memory of this process in bytes, or None if unknown"""
+    if psutil is not None:
+        return psutil.Process(os.getpid()).memory_info().rss
+    try:
+        import resource
+    except ImportError:
+        return None
+    # ru_maxrss is the peak, reported in KB on Linux and in bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def register(name, loader):
+    """Register a function that builds the model called `name`"""
+    with _registry_lock:
+        _loaders[name] = loader
+        _load_locks.setdefault(name, threading.Lock())
+
+
+def get(name):
+    """Return the handle for `name`, loading the model on first use"""
+    handle = _handles.get(name)
+    if handle is not None:
+        return handle
+
+    with _registry_lock:
+        if name not in _loaders:
+            raise KeyError(f"No model registered under '{name}'")
+        load_lock = _load_locks[name]
+
+    # One lock per model so loading BLIP does not block loading EasyOCR
+    with load_lock:
+        handle = _handles.get(name)
+        if handle is None:
+            memory_before = resident_memory()
+            start = time.perf_counter()
+            model = _loaders[name]()
+            load_seconds = time.perf_counter() - start
+            memory_after = resident_memory()
+            memory_bytes = (
+                memory_after - memory_before
+                if memory_before is not None and memory_after is not None
+                else None
+            )
+            handle = ModelHandle(name, model, load_seconds, memory_bytes)
+            _handles[name] = handle
+            print(f"Loaded model '{name}' in {load_seconds:.2f}s")
+    return handle
+
+
+def is_loaded(name):
+    """Check whether a model has already been loaded in this process"""
+    return name in _handles
+
+
+def warm_up(*names):
+    """Load the given models (all registered models if none given) up front"""
+    for name in names or list(_loaders):
+        get(name)
+
+
+def report():
+    """Return load time and memory for every loaded model as a list of dicts"""
+    return [
+        {
+            "Model": handle.name,
+            "Load Seconds": round(handle.load_seconds, 3),
+            "Memory MB": (
+                round(handle.memory_bytes / (1024 * 1024), 1)
+                if handle.memory_bytes is not None
+                else None
+            ),
+        }
+        for handle in _handles.values()
+    ]
+
+
+def print_report():
+    """Print the model load report along with the process resident memory"""
+    for row in report():
+        memory = "n/a" if row["Memory MB"] is None else f"{row['Memory MB']} MB"
+        print(f"{row['Model']}: loaded in {row['Load Seconds']}s, {memory}")
+    total = resident_memory()
+    if total is not None:
+        print(f"Process resident memory: {total / (1024 * 1024):.1f} MB")
+
+
+def _load_easyocr(gpu):
+    import easyocr
+
+    return easyocr.Reader(OCR_LANGUAGES, gpu=gpu)
+
+
+def _check_quantized_device(quantized, device):
+    if quantized and device != "cpu":
+        raise ValueError("int8 dynamic quantization is only supported on the CPU")
+
+
+def _load_blip(device, quantized):
+    from transformers import BlipProcessor, BlipForConditionalGeneration
+
+    processor = BlipProcessor.from_pretrained(BLIP_MODEL_NAME)
+    if quantized:
+        import devices
+
+        model = devices.load_quantized(
+            BLIP_MODEL_NAME.split("/")[-1],
+            lambda: BlipForConditionalGeneration.from_pretrained(BLIP_MODEL_NAME),
+        )
+    else:
+        model = BlipForConditionalGeneration.from_pretrained(BLIP_MODEL_NAME)
+        model = model.to(device)
+    model.eval()
+    return processor, model
+
+
+def _load_blip_onnx(export_dir, threads):
+    from blip_onnx import OnnxBlipCaptioner
+
+    return OnnxBlipCaptioner(export_dir, threads)
+
+
+def _load_classifier(model_path, device, quantized):
+    from transformers import AutoTokenizer, AutoModelForSequenceClassification
+
+    tokenizer = AutoTokenizer.from_pretrained(model_path)
+    if quantized:
+        import devices
+
+        model = devices.load_quantized(
+            os.path.basename(os.path.normpath(model_path)),
+            lambda: AutoModelForSequenceClassification.from_pretrained(model_path),
+        )
+    else:
+        model = AutoModelForSequenceClassification.from_pretrained(model_path)
+        model = model.to(device)
+    model.eval()
+    return tokenizer, model
+
+
+def _load_marian(model_path, device):
+    from transformers import MarianMTModel, MarianTokenizer
+
+    tokenizer = MarianTokenizer.from_pretrained(model_path)
+    model = MarianMTModel.from_pretrained(model_path).to(device)
+    model.eval()
+    return tokenizer, model
+
+
+def get_easyocr_reader(gpu=True):
+    """Return the shared EasyOCR handle; use `with handle as reader:`"""
+    name = "easyocr:gpu" if gpu else "easyocr:cpu"
+    if name not in _loaders:
+        register(name, lambda: _load_easyocr(gpu))
+    return get(name)
+
+
+def get_blip(device="cuda", quantized=False):
+    """
+    Return the shared BLIP handle; use `with handle as (processor, model):`
+
+    `quantized` selects the int8 dynamic-quantized model, CPU only.
+    """
+    _check_quantized_device(quantized, device)
+    name = f"blip:{device}:int8" if quantized else f"blip:{device}"
+    if name not in _loaders:
+        register(name, lambda: _load_blip(device, quantized))
+    return get(name)
+
+
+def get_blip_onnx(export_dir=None, threads=None):
+    """
+    Return the shared ONNX BLIP handle; use `with handle as captioner:`
+
+    `export_dir` defaults to the folder `python blip_onnx.py export` writes.
+    """
+    if export_dir is None:
+        from blip_onnx import DEFAULT_EXPORT_DIR
+
+        export_dir = DEFAULT_EXPORT_DIR
+    name = f"blip-onnx:{os.path.abspath(export_dir)}"
+    if name not in _loaders:
+        register(name, lambda: _load_blip_onnx(export_dir, threads))
+    return get(name)
+
+
+def get_ideology_classifier(model_path, device="cpu", quantized=False):
+    """
+    Return the shared ideology classifier handle; use
+    `with handle as (tokenizer, model):`
+
+    `quantized` selects the int8 dynamic-quantized model, CPU only.
+    """
+    _check_quantized_device(quantized, device)
+    name = f"classifier:{model_path}:{device}" + (":int8" if quantized else "")
+    if name not in _loaders:
+        register(name, lambda: _load_classifier(model_path, device, quantized))
+    return get(name)
+
+
+def get_marian(model_path=MARIAN_MODEL_NAME, device="cpu"):
+    """Return the shared Marian handle; use `with handle as (tokenizer, model):`"""
+    name = f"marian:{model_path}:{device}"
+    if name not in _loaders:
+        register(name, lambda: _load_marian(model_path, device))
+    return get(name)
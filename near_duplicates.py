@@ -0,0 +1,157 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from PIL import Image
+
+# Largest Hamming distance between two 64-bit dHashes still treated as the
+# same meme. Kept low on purpose: one template with different captions can
+# hash close too, and copying the wrong text is worse than a missed saving.
+DEFAULT_MAX_DISTANCE = 4
+
+
+def dhash(path, hash_size=8):
+    """
+    Difference hash of an image file as an int of hash_size**2 bits.
+
+    Each bit says whether a pixel of the shrunken grayscale image is brighter
+    than its right neighbour, which survives resizing and re-compression.
+    Also returns the image area, used to pick the best copy of a meme.
+    """
+    with Image.open(path) as image:
+        area = image.size[0] * image.size[1]
+        # Only a tiny thumbnail is needed, so let JPEGs decode at 1/8 scale
+        image.draft("L", (hash_size * 8, hash_size * 8))
+        pixels = list(
+            image.convert("L")
+            .resize((hash_size + 1, hash_size), Image.BILINEAR)
+            .getdata()
+        )
+    bits = 0
+    for row in range(hash_size):
+        offset = row * (hash_size + 1)
+        for column in range(hash_size):
+            bits = (bits << 1) | (pixels[offset + column] > pixels[offset + column + 1])
+    return bits, area
+
+
+def hamming(a, b):
+    """Number of differing bits between two hashes"""
+    return bin(a ^ b).count("1")
+
+
+class BKTree:
+    """
+    Burkhard-Keller tree over hashes, for radius queries in Hamming space.
+
+    Children are keyed by their distance to the parent, so by the triangle
+    inequality a query only has to visit children whose key is within
+    `max_distance` of the query's own distance to the node.
+    """
+
+    def __init__(self):
+        self.root = None
+        self.size = 0
+
+    def add(self, value, item):
+        """Insert a hash along with the item it belongs to"""
+        self.size += 1
+        node = (value, item, {})
+        if self.root is None:
+            self.root = node
+            return
+        current = self.root
+        while True:
+            distance = hamming(value, current[0])
+            child = current[2].get(distance)
+            if child is None:
+                current[2][distance] = node
+                return
+            current = child
+
+    def find(self, value, max_distance):
+        """Return (distance, item) pairs within max_distance, nearest first"""
+        if self.root is None:
+            return []
+        matches = []
+        pending = [self.root]
+        while pending:
+            node_value, item, children = pending.pop()
+            distance = hamming(value, node_value)
+            if distance <= max_distance:
+                matches.append((distance, item))
+            for child_distance, child in children.items():
+                if abs(child_distance - distance) <= max_distance:
+                    pending.append(child)
+        return sorted(matches, key=lambda match: match[0])
+
+
+class NearDuplicateClusters:
+    """
+    Groups image files into clusters of near-duplicates by perceptual hash.
+
+    Each file joins the cluster whose first member is nearest to it, or
+    starts a new cluster. Only the first member of each cluster is indexed,
+    so a chain of small edits cannot drift a cluster across unrelated memes.
+    The largest image of a cluster is its representative, since the
+    sharpest copy gives the best OCR.
+
+    Args:
+        max_distance (int): Largest Hamming distance within a cluster.
+    """
+
+    def __init__(self, max_distance=DEFAULT_MAX_DISTANCE):
+        self.max_distance = max_distance
+        self.tree = BKTree()
+        self.clusters = []
+        self.unhashable = 0
+        self._lock = threading.Lock()
+
+    def add(self, path, value, area):
+        """Place a hashed file in a cluster and return the cluster id"""
+        with self._lock:
+            matches = self.tree.find(value, self.max_distance)
+            if matches:
+                cluster_id = matches[0][1]
+            else:
+                cluster_id = len(self.clusters)
+                self.clusters.append([])
+                self.tree.add(value, cluster_id)
+            self.clusters[cluster_id].append((area, path))
+            return cluster_id
+
+    def add_files(self, paths, workers=4):
+        """Hash files in parallel and cluster them in their input order"""
+
+        def hash_file(path):
+            try:
+                return path, dhash(path)
+            except Exception as e:
+                print(f"Could not hash {path}: {e}")
+                return path, None
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for path, hashed in pool.map(hash_file, paths):
+                if hashed is None:
+                    # Still analysed, just on its own
+                    self.unhashable += 1
+                    with self._lock:
+                        self.clusters.append([(0, path)])
+                else:
+                    self.add(path, *hashed)
+
+    def groups(self):
+        """Yield (cluster id, representative path, other member paths)"""
+        for cluster_id, members in enumerate(self.clusters):
+            # Largest first; ties keep the order the files were found in
+            ordered = sorted(members, key=lambda member: -member[0])
+            yield cluster_id, ordered[0][1], [path for _, path in ordered[1:]]
+
+    def stats(self):
+        """Files, clusters and the analyses saved by skipping duplicates"""
+        files = sum(len(members) for members in self.clusters)
+        return {
+            "files": files,
+            "clusters": len(self.clusters),
+            "duplicates": files - len(self.clusters),
+            "unhashable": self.unhashable,
+        }
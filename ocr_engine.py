@@ -0,0 +1,227 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+import model_registry
+from batch_scheduler import BatchScheduler
+
+# Height EasyOCR's recognizer expects its crops at (easyocr.config.imgH)
+RECOGNIZER_HEIGHT = 64
+
+
+def reading_order(results):
+    """
+    Sort (box, text, confidence) results into lines, top to bottom, and
+    each line left to right.
+
+    A box starts a new line when its vertical centre is more than half a
+    box height below the centre of the line's first box.
+    """
+
+    def top(item):
+        return min(point[1] for point in item[0])
+
+    def bottom(item):
+        return max(point[1] for point in item[0])
+
+    def left(item):
+        return min(point[0] for point in item[0])
+
+    lines = []
+    for item in sorted(results, key=lambda item: (top(item) + bottom(item)) / 2):
+        centre = (top(item) + bottom(item)) / 2
+        height = bottom(item) - top(item)
+        if lines and centre - lines[-1][0] <= height / 2:
+            lines[-1][1].append(item)
+        else:
+            lines.append((centre, [item]))
+    return [item for _, line in lines for item in sorted(line, key=left)]
+
+
+def rgb_and_grey(image):
+    """
+    The colour and greyscale images EasyOCR's detector and recognizer take.
+
+    EasyOCR's own `reformat_input` treats 3-channel arrays as BGR, but the
+    pipeline decodes images to RGB, so their greyscale is computed here with
+    RGB weights instead. Paths and bytes are left to EasyOCR.
+    """
+    import cv2
+    import numpy as np
+    from easyocr.utils import reformat_input
+
+    if isinstance(image, np.ndarray) and image.ndim == 3 and image.shape[2] in (3, 4):
+        rgb = np.ascontiguousarray(image[:, :, :3])
+        return rgb, cv2.cvtColor(rgb, cv2.COLOR_RGB2GRAY)
+    return reformat_input(image)
+
+
+def readtext_rgb(reader, image, **kwargs):
+    """
+    `reader.readtext` for an RGB array (or path), with a matching greyscale.
+
+    Results come back in the same reading order as OcrEngine's, so the
+    joined text does not depend on which path read the image.
+    """
+    rgb, grey = rgb_and_grey(image)
+    horizontal, free = reader.detect(rgb, reformat=False)
+    return reading_order(
+        reader.recognize(grey, horizontal[0], free[0], reformat=False, **kwargs)
+    )
+
+
+class OcrEngine:
+    """
+    Runs EasyOCR with the text crops of many images pooled into shared
+    recognizer batches.
+
+    `readtext` recognizes the handful of boxes of one meme at a time, which
+    leaves the recognizer mostly idle. Here callers submit images from any
+    number of threads; a background thread collects up to `max_images` of
+    them (waiting at most `max_wait` seconds), runs text detection on each,
+    and sends all of their crops through the recognizer together. The
+    results are handed back per image, in reading order, in the same
+    (box, text, confidence) form as `readtext`.
+
+    Args:
+        gpu (bool): Use the GPU EasyOCR reader.
+        scheduler (BatchScheduler): Picks the recognizer batch size (crops
+            per forward pass) and shrinks it on out-of-memory errors.
+        max_images (int): Largest number of images pooled together.
+        max_wait (float): Seconds to wait for more images before running a
+            partial pool.
+    """
+
+    def __init__(self, gpu=True, scheduler=None, max_images=16, max_wait=0.05):
+        self.gpu = gpu
+        self.scheduler = scheduler or BatchScheduler(
+            "OCR", "cuda" if gpu else "cpu", max_batch_size=64
+        )
+        self.max_images = max_images
+        self.max_wait = max_wait
+        self.pools_run = 0
+        self.images_read = 0
+        self.crops_recognized = 0
+        self._queue = queue.Queue()
+        self._worker = None
+        self._start_lock = threading.Lock()
+
+    def _ensure_started(self):
+        if self._worker is not None:
+            return
+        with self._start_lock:
+            if self._worker is None:
+                self._worker = threading.Thread(
+                    target=self._run, name="ocr-engine", daemon=True
+                )
+                self._worker.start()
+
+    def _next_batch(self):
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_images:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            images, futures = [], []
+            for image, future in self._next_batch():
+                if future.set_running_or_notify_cancel():
+                    images.append(image)
+                    futures.append(future)
+            if not images:
+                continue
+            try:
+                results = self.read_many(images)
+            except Exception:
+                # Retry one image at a time, so only the bad image fails
+                for image, future in zip(images, futures):
+                    try:
+                        future.set_result(self.read_many([image])[0])
+                    except Exception as e:
+                        future.set_exception(e)
+                continue
+            for future, result in zip(futures, results):
+                future.set_result(result)
+
+    def read_many(self, images):
+        """Detect text in every image, then recognize all crops together"""
+        from easyocr.recognition import get_text
+        from easyocr.utils import get_image_list
+
+        with model_registry.get_easyocr_reader(gpu=self.gpu) as reader:
+            crops = []
+            owners = []
+            for index, image in enumerate(images):
+                rgb, grey = rgb_and_grey(image)
+                horizontal, free = reader.detect(rgb, reformat=False)
+                image_list, _ = get_image_list(
+                    horizontal[0], free[0], grey, model_height=RECOGNIZER_HEIGHT
+                )
+                crops.extend(image_list)
+                owners.extend([index] * len(image_list))
+
+            results = [[] for _ in images]
+            if crops:
+                # Crops are padded to the widest one in the whole pool, where
+                # readtext pads to the widest of one image; see
+                # benchmarks/ocr_batching_benchmark.py for the effect on text
+                max_width = max(crop.shape[1] for _, crop in crops)
+                ignore_char = "".join(set(reader.character) - set(reader.lang_char))
+                recognized = self.scheduler.call(
+                    lambda batch_size: get_text(
+                        reader.character,
+                        RECOGNIZER_HEIGHT,
+                        int(max_width),
+                        reader.recognizer,
+                        reader.converter,
+                        crops,
+                        ignore_char,
+                        batch_size=batch_size,
+                        workers=0,
+                        device=reader.device,
+                    )
+                )
+                for owner, item in zip(owners, recognized):
+                    results[owner].append(item)
+
+        self.pools_run += 1
+        self.images_read += len(images)
+        self.crops_recognized += len(crops)
+        return [reading_order(result) for result in results]
+
+    def submit(self, image):
+        """Queue an RGB array (or path) and return a Future of its results"""
+        self._ensure_started()
+        future = Future()
+        self._queue.put((image, future))
+        return future
+
+    def readtext(self, image):
+        """OCR one image, sharing recognizer batches with concurrent callers"""
+        return self.submit(image).result()
+
+    def stats(self):
+        return {
+            "pools_run": self.pools_run,
+            "images_read": self.images_read,
+            "crops_recognized": self.crops_recognized,
+        }
+
+    def print_summary(self):
+        stats = self.stats()
+        if not stats["pools_run"]:
+            return
+        print(
+            f"OCR engine: {stats['images_read']} image(s) in {stats['pools_run']} "
+            f"pool(s), {stats['crops_recognized'] / stats['pools_run']:.1f} "
+            f"crop(s) per recognizer pass on average."
+        )
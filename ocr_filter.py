@@ -0,0 +1,196 @@
+"""
+Box-level filtering of EasyOCR results before their text is used.
+
+Drops boxes with low recognizer confidence, boxes too small to be caption
+text, and recurring watermark strings (site handles, page names). The
+blocklist is learned from how many images of the corpus a box string shows
+up in, using the boxes kept in the OCR side store:
+
+    python ocr_filter.py learn --output ocr_blocklist.txt --min-share 0.01
+"""
+
+import argparse
+import hashlib
+import os
+import threading
+from collections import Counter
+
+DEFAULT_BLOCKLIST_FILE = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "ocr_blocklist.txt"
+)
+
+
+def normalize(text):
+    """Lower-case letters and digits only, so '@Memes.PH' matches 'memes ph'"""
+    return "".join(character for character in text.lower() if character.isalnum())
+
+
+def load_blocklist(path=DEFAULT_BLOCKLIST_FILE):
+    """Normalized strings from a blocklist file, or an empty set if it is missing"""
+    if not os.path.exists(path):
+        return set()
+    with open(path, encoding="utf-8") as file:
+        return {normalize(line) for line in file if normalize(line)}
+
+
+def learn_blocklist(box_texts, min_share=0.01, min_count=20, min_length=4):
+    """
+    Box strings that recur across too many images to be meme captions.
+
+    Args:
+        box_texts (iterable): One list of box strings per image.
+        min_share (float): Share of images a string must appear in.
+        min_count (int): Fewest images a string must appear in.
+        min_length (int): Shorter normalized strings are never blocked, so
+            common short words are not mistaken for watermarks.
+
+    Returns:
+        list: (normalized string, image count) pairs, most frequent first.
+    """
+    counts = Counter()
+    images = 0
+    for texts in box_texts:
+        images += 1
+        counts.update({normalize(text) for text in texts})
+    threshold = max(min_count, min_share * images)
+    return [
+        (text, count)
+        for text, count in counts.most_common()
+        if count >= threshold and len(text) >= min_length
+    ]
+
+
+class OcrFilter:
+    """
+    Drops EasyOCR boxes that are unlikely to be meme text.
+
+    Keeps counts of what was dropped and of the characters of joined text
+    before and after filtering, i.e. what translation and the ideology
+    classifier are spared.
+
+    Args:
+        min_confidence (float): Boxes recognized with less confidence are
+            dropped.
+        min_height (int): Boxes shorter than this, in pixels of the original
+            image, are dropped, whatever size the OCR profile resized it to.
+        blocklist (set): Normalized box strings that are always dropped.
+    """
+
+    def __init__(self, min_confidence=0.2, min_height=8, blocklist=None):
+        self.min_confidence = min_confidence
+        self.min_height = min_height
+        self.blocklist = set(blocklist or ())
+        self.boxes_seen = 0
+        self.dropped = Counter()
+        self.chars_seen = 0
+        self.chars_kept = 0
+        self._lock = threading.Lock()
+
+    def version(self):
+        """Short string that changes whenever the filter settings do"""
+        digest = hashlib.sha256("\n".join(sorted(self.blocklist)).encode()).hexdigest()
+        return f"conf{self.min_confidence}-h{self.min_height}-bl{digest[:8]}"
+
+    def _reason(self, item, scale):
+        box, text, confidence = item[0], item[1], item[2]
+        if confidence < self.min_confidence:
+            return "low confidence"
+        height = max(point[1] for point in box) - min(point[1] for point in box)
+        if height / scale < self.min_height:
+            return "small"
+        if normalize(text) in self.blocklist:
+            return "blocklisted"
+        return None
+
+    def apply(self, result, scale=1.0):
+        """
+        Return the (box, text, confidence) items that pass, in order.
+
+        Args:
+            result (list): (box, text, confidence) items from EasyOCR.
+            scale (float): Factor the image was resized by before OCR, so box
+                heights are compared in original-image pixels.
+        """
+        scale = scale or 1.0
+        kept = []
+        dropped = Counter()
+        for item in result:
+            reason = self._reason(item, scale)
+            if reason is None:
+                kept.append(item)
+            else:
+                dropped[reason] += 1
+        seen = len(" ".join(item[1] for item in result))
+        with self._lock:
+            self.boxes_seen += len(result)
+            self.dropped.update(dropped)
+            self.chars_seen += seen
+            self.chars_kept += len(" ".join(item[1] for item in kept))
+        return kept
+
+    def stats(self):
+        with self._lock:
+            return {
+                "boxes_seen": self.boxes_seen,
+                "boxes_dropped": sum(self.dropped.values()),
+                "dropped": dict(self.dropped),
+                "chars_seen": self.chars_seen,
+                "chars_kept": self.chars_kept,
+            }
+
+    def print_summary(self):
+        stats = self.stats()
+        if not stats["boxes_seen"]:
+            return
+        reasons = ", ".join(
+            f"{count} {reason}" for reason, count in stats["dropped"].items()
+        )
+        print(
+            f"OCR filter: dropped {stats['boxes_dropped']} of "
+            f"{stats['boxes_seen']} box(es)" + (f" ({reasons})." if reasons else ".")
+        )
+        if stats["chars_seen"]:
+            saved = stats["chars_seen"] - stats["chars_kept"]
+            print(
+                f"OCR text before translation and caching: "
+                f"{stats['chars_kept']} of {stats['chars_seen']} character(s) kept, "
+                f"{saved} ({saved / stats['chars_seen']:.1%}) fewer."
+            )
+
+
+def main():
+    from ocr_store import DEFAULT_STORE_FOLDER, OcrStore
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("command", choices=["learn"])
+    parser.add_argument("--store", default=DEFAULT_STORE_FOLDER)
+    parser.add_argument(
+        "--version",
+        default="easyocr-en-tl-balanced",
+        help="OCR version the stored entries were written under",
+    )
+    parser.add_argument("--output", default=DEFAULT_BLOCKLIST_FILE)
+    parser.add_argument("--min-share", type=float, default=0.01)
+    parser.add_argument("--min-count", type=int, default=20)
+    args = parser.parse_args()
+
+    entries = OcrStore(args.store, version=args.version).load()
+    if not entries:
+        print(f"No OCR entries under '{args.version}' in '{args.store}'.")
+        return
+    learned = learn_blocklist(
+        (entry.texts for _, entry in entries.values()),
+        min_share=args.min_share,
+        min_count=args.min_count,
+    )
+    for text, count in learned:
+        print(f"{count:>7} {text}")
+    with open(args.output, "w", encoding="utf-8") as file:
+        file.writelines(f"{text}\n" for text, _ in learned)
+    print(
+        f"{len(learned)} string(s) from {len(entries)} image(s) saved to {args.output}"
+    )
+
+
+if __name__ == "__main__":
+    main()
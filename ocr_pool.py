@@ -0,0 +1,88 @@
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from model_registry import OCR_LANGUAGES
+from ocr_engine import readtext_rgb
+
+# The EasyOCR reader owned by the current worker process
+_reader = None
+
+
+def _init_worker(languages, gpu, threads):
+    """Runs once in each worker process: size torch's thread pool, load the reader"""
+    global _reader
+    import torch
+    import easyocr
+
+    # Each process gets its share of the cores so workers do not oversubscribe
+    torch.set_num_threads(threads)
+    _reader = easyocr.Reader(languages, gpu=gpu)
+
+
+def _readtext(image, kwargs):
+    return readtext_rgb(_reader, image, **kwargs)
+
+
+class OcrPool:
+    """
+    Pool of OCR worker processes, each holding one long-lived EasyOCR reader.
+
+    Images are fed to the workers through the executor's shared call queue,
+    so any idle worker picks up the next image. The machine's cores are split
+    evenly between the workers' torch thread pools. The processes are only
+    started on the first submitted image.
+
+    Args:
+        workers (int): Number of worker processes; defaults to half the cores.
+        threads_per_worker (int): torch threads per worker; defaults to an even
+            split of the cores.
+        gpu (bool): Let EasyOCR use the GPU in every worker.
+        languages (list): EasyOCR language codes.
+    """
+
+    def __init__(
+        self, workers=None, threads_per_worker=None, gpu=False, languages=None
+    ):
+        cores = os.cpu_count() or 1
+        self.workers = workers or max(1, cores // 2)
+        self.threads_per_worker = threads_per_worker or max(1, cores // self.workers)
+        self.gpu = gpu
+        self.languages = languages or OCR_LANGUAGES
+        self._executor = None
+        self._start_lock = threading.Lock()
+
+    def _ensure_started(self):
+        if self._executor is not None:
+            return self._executor
+        with self._start_lock:
+            if self._executor is None:
+                # Spawned, not forked: by now the parent runs torch and the
+                # pipeline threads, and forking a threaded process can deadlock
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_worker,
+                    initargs=(self.languages, self.gpu, self.threads_per_worker),
+                )
+        return self._executor
+
+    def submit(self, image, **kwargs):
+        """Queue an image (path, bytes or array) and return a Future of readtext"""
+        return self._ensure_started().submit(_readtext, image, kwargs)
+
+    def readtext(self, image, **kwargs):
+        """Run EasyOCR's readtext on an image in one of the worker processes"""
+        return self.submit(image, **kwargs).result()
+
+    def map(self, images, **kwargs):
+        """readtext results for many images, in input order"""
+        futures = [self.submit(image, **kwargs) for image in images]
+        return [future.result() for future in futures]
+
+    def close(self):
+        with self._start_lock:
+            if self._executor is not None:
+                self._executor.shutdown()
+                self._executor = None
@@ -0,0 +1,256 @@
+"""
+Columnar side store for raw OCR output: boxes, texts and confidences.
+
+The pipeline keeps only the joined "Extracted Text"; this store keeps every
+box EasyOCR found, keyed by image hash, so the text can be re-derived under
+new thresholds without running OCR again.
+
+    python ocr_store.py stats
+    python ocr_store.py text --workbook Results.xlsx --output Rederived.xlsx \\
+        --min-confidence 0.4 --min-height 8
+"""
+
+import argparse
+import glob
+import os
+import threading
+import time
+
+import numpy as np
+
+from ocr_filter import DEFAULT_BLOCKLIST_FILE, OcrFilter, load_blocklist
+
+DEFAULT_STORE_FOLDER = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "ocr_store"
+)
+
+
+class OcrEntry:
+    """
+    The OCR boxes of one image, as arrays.
+
+    Args:
+        boxes (ndarray): float32 (n, 4, 2) corner points in the pixels of
+            the original image.
+        texts (list): Recognized string of every box.
+        confidences (ndarray): float32 (n,) recognizer confidence per box.
+        scale (float): Factor the image was resized by before OCR.
+    """
+
+    def __init__(self, boxes, texts, confidences, scale):
+        self.boxes = boxes
+        self.texts = texts
+        self.confidences = confidences
+        self.scale = scale
+
+    def items(self):
+        """The boxes as EasyOCR-style (box, text, confidence) items"""
+        return list(zip(self.boxes.tolist(), self.texts, self.confidences.tolist()))
+
+    def text(self, ocr_filter=None):
+        """
+        Join the texts of the boxes an OcrFilter keeps, in order.
+
+        Args:
+            ocr_filter (OcrFilter): Filter to apply, the same one the
+                pipeline uses; every box is kept when None.
+        """
+        items = self.items()
+        if ocr_filter is not None:
+            # Boxes are already stored in original-image pixels
+            items = ocr_filter.apply(items)
+        return " ".join(item[1] for item in items)
+
+
+class OcrStore:
+    """
+    Append-only store of OCR results, written as compressed .npz chunks.
+
+    Each chunk holds the boxes of many images flattened into a few columns,
+    with per-image offsets into them, and the texts as one UTF-8 blob with
+    per-box offsets. `add` buffers in memory; `flush` writes the buffer as
+    a new chunk. When an image hash appears in several chunks the newest
+    one wins.
+
+    Args:
+        folder (str): Folder the chunk files live in.
+        version (str): OCR model/settings the boxes came from; `load` only
+            returns entries written under the same version.
+        flush_every (int): Write a chunk after this many images.
+    """
+
+    def __init__(self, folder=DEFAULT_STORE_FOLDER, version="1", flush_every=500):
+        self.folder = folder
+        self.version = version
+        self.flush_every = flush_every
+        self._pending = []
+        self._lock = threading.Lock()
+        self._entries = None
+
+    def add(self, digest, name, result, scale=1.0):
+        """
+        Buffer the readtext output of one image.
+
+        Args:
+            digest (str): Image hash the entry is keyed by.
+            name (str): File name, for joining with results workbooks.
+            result (list): (box, text, confidence) items from EasyOCR.
+            scale (float): Factor the image was resized by before OCR; boxes
+                are stored in original-image pixels.
+        """
+        boxes = np.array([item[0] for item in result], dtype=np.float32).reshape(
+            -1, 4, 2
+        ) / (scale or 1.0)
+        texts = [str(item[1]) for item in result]
+        confidences = np.array([item[2] for item in result], dtype=np.float32)
+        with self._lock:
+            self._pending.append((digest, name, boxes, texts, confidences, scale))
+            if self._entries is not None:
+                self._entries[digest] = (
+                    name,
+                    OcrEntry(boxes, texts, confidences, scale),
+                )
+            if len(self._pending) >= self.flush_every:
+                self._flush_locked()
+
+    def flush(self):
+        """Write buffered entries to a new chunk file"""
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_locked(self):
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, []
+        counts = [len(texts) for _, _, _, texts, _, _ in pending]
+        encoded = [
+            text.encode("utf-8") for _, _, _, texts, _, _ in pending for text in texts
+        ]
+        columns = {
+            "version": np.array(self.version),
+            "hashes": np.array([entry[0] for entry in pending]),
+            "names": np.array([entry[1] for entry in pending]),
+            "scales": np.array([entry[5] for entry in pending], dtype=np.float32),
+            "offsets": np.concatenate([[0], np.cumsum(counts)]).astype(np.int64),
+            "boxes": np.concatenate([entry[2] for entry in pending]),
+            "confidences": np.concatenate([entry[4] for entry in pending]),
+            "text_offsets": np.concatenate(
+                [[0], np.cumsum([len(data) for data in encoded])]
+            ).astype(np.int64),
+            "text_data": np.frombuffer(b"".join(encoded), dtype=np.uint8),
+        }
+        os.makedirs(self.folder, exist_ok=True)
+        # Names sort by creation time, which is the order `load` applies them
+        path = os.path.join(self.folder, f"ocr_{time.time_ns()}_{os.getpid()}.npz")
+        # Written under a temporary name so readers never see half a chunk
+        temporary = path + ".tmp"
+        with open(temporary, "wb") as file:
+            np.savez_compressed(file, **columns)
+        os.replace(temporary, path)
+
+    def close(self):
+        self.flush()
+
+    def load(self):
+        """Read every chunk of this version: image hash -> (name, OcrEntry)"""
+        with self._lock:
+            if self._entries is not None:
+                return self._entries
+            entries = {}
+            for path in sorted(glob.glob(os.path.join(self.folder, "ocr_*.npz"))):
+                with np.load(path) as chunk:
+                    if str(chunk["version"]) != self.version:
+                        continue
+                    entries.update(_read_chunk(chunk))
+            for digest, name, boxes, texts, confidences, scale in self._pending:
+                entries[digest] = (name, OcrEntry(boxes, texts, confidences, scale))
+            self._entries = entries
+            return entries
+
+    def get(self, digest):
+        """OcrEntry for an image hash, or None"""
+        entry = self.load().get(digest)
+        return entry[1] if entry is not None else None
+
+    def by_name(self):
+        """File name -> OcrEntry (the newest entry when a name repeats)"""
+        return {name: entry for name, entry in self.load().values()}
+
+
+def _read_chunk(chunk):
+    offsets = chunk["offsets"]
+    text_offsets = chunk["text_offsets"]
+    text_data = chunk["text_data"].tobytes()
+    texts = [
+        text_data[start:end].decode("utf-8")
+        for start, end in zip(text_offsets[:-1], text_offsets[1:])
+    ]
+    boxes = chunk["boxes"]
+    confidences = chunk["confidences"]
+    for index, (digest, name, scale) in enumerate(
+        zip(chunk["hashes"], chunk["names"], chunk["scales"])
+    ):
+        start, end = offsets[index], offsets[index + 1]
+        yield str(digest), (
+            str(name),
+            OcrEntry(
+                boxes[start:end], texts[start:end], confidences[start:end], float(scale)
+            ),
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("command", choices=["stats", "text"])
+    parser.add_argument("--store", default=DEFAULT_STORE_FOLDER)
+    parser.add_argument(
+        "--version",
+        default="easyocr-en-tl-balanced",
+        help="OCR version the entries were written under",
+    )
+    parser.add_argument("--workbook", help="Results workbook to re-derive text for")
+    parser.add_argument("--output", help="Where to write the re-derived workbook")
+    parser.add_argument("--min-confidence", type=float, default=0.0)
+    parser.add_argument(
+        "--min-height", type=float, default=0.0, help="Smallest box height in pixels"
+    )
+    parser.add_argument(
+        "--blocklist",
+        default=DEFAULT_BLOCKLIST_FILE,
+        help="Watermark strings to drop, from `python ocr_filter.py learn`",
+    )
+    args = parser.parse_args()
+
+    store = OcrStore(args.store, version=args.version)
+    entries = store.load()
+    if args.command == "stats":
+        boxes = sum(len(entry.texts) for _, entry in entries.values())
+        print(f"{len(entries)} image(s), {boxes} box(es) under '{args.version}'.")
+        return
+
+    if not args.workbook or not args.output:
+        parser.error("text needs --workbook and --output")
+    import pandas as pd
+
+    ocr_filter = OcrFilter(
+        min_confidence=args.min_confidence,
+        min_height=args.min_height,
+        blocklist=load_blocklist(args.blocklist),
+    )
+    df = pd.read_excel(args.workbook)
+    by_name = store.by_name()
+    names = df["File Name"].astype(str)
+    # Images without stored boxes keep their original text
+    df["Extracted Text"] = [
+        by_name[name].text(ocr_filter) if name in by_name else old
+        for name, old in zip(names, df["Extracted Text"])
+    ]
+    df.to_excel(args.output, index=False)
+    print(
+        f"Re-derived text for {int(names.isin(by_name).sum())} of {len(df)} row(s) "
+        f"into {args.output}."
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+import queue
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+# Marks the end of the input on every queue
+_STOP = object()
+
+
+class Stage:
+    """
+    One step of a pipeline.
+
+    Args:
+        name (str): Label used in progress and error messages.
+        fn (callable): Takes one item and returns the item for the next stage,
+            or None to drop it. Must be a module-level function when
+            `executor` is "process" so it can be pickled.
+        workers (int): Number of items this stage works on at the same time.
+        executor (str): "thread" to run `fn` in worker threads, or "process"
+            to run it in a pool of `workers` processes.
+        queue_size (int): Capacity of the queue feeding this stage; defaults
+            to the pipeline's queue size.
+    """
+
+    def __init__(self, name, fn, workers=1, executor="thread", queue_size=None):
+        if executor not in ("thread", "process"):
+            raise ValueError(f"Unknown executor '{executor}' for stage '{name}'")
+        self.name = name
+        self.fn = fn
+        self.workers = max(1, workers)
+        self.executor = executor
+        self.queue_size = queue_size
+
+
+class Pipeline:
+    """
+    Runs items through a chain of stages connected by bounded queues.
+
+    Every stage has its own workers, so slow network calls in one stage do not
+    hold up the CPU-heavy stages. Queues are bounded, so when a later stage
+    falls behind the earlier ones block instead of piling up items in memory.
+    Items that raise are reported in `failures` as (stage name, label, error)
+    and do not reach later stages; the failed item itself is not kept.
+
+    Args:
+        stages (list): The Stage objects, in order.
+        queue_size (int): Default capacity of the queues between stages.
+        label (callable): Turns an item into the name printed when it fails.
+        done (callable): Returns True for items that are already finished
+            (e.g. served from a cache) so they skip the remaining stages.
+        on_failure (callable): Called with (stage name, item, error) as soon
+            as an item fails.
+        tracer (Tracer): When set, records the time each item spends in every
+            stage and waiting in the queue in front of it.
+    """
+
+    def __init__(
+        self,
+        stages,
+        queue_size=32,
+        label=str,
+        done=None,
+        on_failure=None,
+        tracer=None,
+    ):
+        self.stages = stages
+        self.queue_size = queue_size
+        self.label = label
+        self.done = done
+        self.on_failure = on_failure
+        self.tracer = tracer
+        self.failures = []
+        self._failures_lock = threading.Lock()
+
+    def _record_failure(self, stage, item, error):
+        label = self.label(item)
+        print(f"Error in stage '{stage.name}' for {label}: {error}")
+        # Only the label is kept, so failed items (and their decoded images)
+        # can be freed
+        with self._failures_lock:
+            self.failures.append((stage.name, label, error))
+        if self.on_failure is not None:
+            self.on_failure(stage.name, item, error)
+
+    def _now(self):
+        return self.tracer.now() if self.tracer is not None else None
+
+    def _start_stage(self, stage, inbox, outbox, output, pool):
+        remaining = [stage.workers]
+        remaining_lock = threading.Lock()
+        tracer = self.tracer
+
+        def work():
+            while True:
+                entry = inbox.get()
+                if entry is _STOP:
+                    # Let sibling workers see the stop marker too
+                    inbox.put(_STOP)
+                    break
+                item, queued_at = entry
+                started = self._now()
+                try:
+                    if pool is not None:
+                        result = pool.submit(stage.fn, item).result()
+                    else:
+                        result = stage.fn(item)
+                except Exception as e:
+                    self._record_failure(stage, item, e)
+                    continue
+                finally:
+                    if tracer is not None:
+                        label = self.label(item)
+                        tracer.add(
+                            f"{stage.name} wait", queued_at, started, label, "queue"
+                        )
+                        tracer.add(stage.name, started, tracer.now(), label)
+                if result is None:
+                    continue
+                if self.done is not None and self.done(result):
+                    output.put((result, self._now()))
+                else:
+                    outbox.put((result, self._now()))
+
+            with remaining_lock:
+                remaining[0] -= 1
+                last = remaining[0] == 0
+            if last:
+                if pool is not None:
+                    pool.shutdown()
+                outbox.put(_STOP)
+
+        threads = [
+            threading.Thread(target=work, name=f"{stage.name}-{i}", daemon=True)
+            for i in range(stage.workers)
+        ]
+        for thread in threads:
+            thread.start()
+        return threads
+
+    def run(self, items):
+        """Feed `items` through every stage and yield finished items as they arrive"""
+        queues = [
+            queue.Queue(maxsize=stage.queue_size or self.queue_size)
+            for stage in self.stages
+        ]
+        queues.append(queue.Queue(maxsize=self.queue_size))
+        output = queues[-1]
+
+        for index, stage in enumerate(self.stages):
+            pool = (
+                ProcessPoolExecutor(max_workers=stage.workers)
+                if stage.executor == "process"
+                else None
+            )
+            self._start_stage(stage, queues[index], queues[index + 1], output, pool)
+
+        def feed():
+            try:
+                for item in items:
+                    queues[0].put((item, self._now()))
+            finally:
+                queues[0].put(_STOP)
+
+        threading.Thread(target=feed, name="pipeline-feed", daemon=True).start()
+
+        while True:
+            entry = output.get()
+            if entry is _STOP:
+                break
+            item, queued_at = entry
+            if self.tracer is not None:
+                self.tracer.add(
+                    "output wait",
+                    queued_at,
+                    self.tracer.now(),
+                    self.label(item),
+                    "queue",
+                )
+            yield item
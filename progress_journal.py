@@ -0,0 +1,93 @@
+import os
+import sqlite3
+import threading
+import time
+
+
+class ProgressJournal:
+    """
+    Durable record of which files a folder run has finished or failed.
+
+    Marks are buffered and committed every `flush_every` marks. Before each
+    commit `on_flush` is called, which lets the results sink write its rows
+    to disk first, so a file is never journaled as done while its row could
+    still be lost. A crash therefore loses at most `flush_every` images.
+
+    Args:
+        path (str): SQLite file holding the journal.
+        flush_every (int): Marks between commits.
+        on_flush (callable): Called with no arguments right before a commit.
+    """
+
+    def __init__(self, path, flush_every=50, on_flush=None):
+        self.path = path
+        self.flush_every = flush_every
+        self.on_flush = on_flush
+        self._lock = threading.RLock()
+        self._pending = 0
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS progress ("
+            "path TEXT PRIMARY KEY, status TEXT NOT NULL, "
+            "error TEXT, updated REAL NOT NULL)"
+        )
+        self._connection.commit()
+
+    def _mark(self, path, status, error=None):
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO progress (path, status, error, updated) "
+                "VALUES (?, ?, ?, ?)",
+                (path, status, error, time.time()),
+            )
+            self._pending += 1
+            if self._pending >= self.flush_every:
+                self.flush()
+
+    def mark_done(self, path):
+        self._mark(path, "done")
+
+    def mark_failed(self, path, error):
+        self._mark(path, "failed", str(error))
+
+    def flush(self):
+        """Let the sink write its rows, then commit the buffered marks"""
+        with self._lock:
+            if self.on_flush is not None:
+                self.on_flush()
+            self._connection.commit()
+            self._pending = 0
+
+    def status(self, path):
+        """ "done", "failed", or None for a path with no recorded progress"""
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT status FROM progress WHERE path = ?", (path,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def _folder_clause(self, folder):
+        prefix = os.path.join(folder, "")
+        return "substr(path, 1, ?) = ?", (len(prefix), prefix)
+
+    def count_in_folder(self, folder, status):
+        """How many paths under `folder` (at any depth) have this status"""
+        clause, params = self._folder_clause(folder)
+        with self._lock:
+            (count,) = self._connection.execute(
+                f"SELECT COUNT(*) FROM progress WHERE status = ? AND {clause}",
+                (status, *params),
+            ).fetchone()
+        return count
+
+    def forget_folder(self, folder):
+        """Drop the progress of every path under `folder`, for a fresh run"""
+        clause, params = self._folder_clause(folder)
+        with self._lock:
+            self._connection.execute(f"DELETE FROM progress WHERE {clause}", params)
+            self._connection.commit()
+
+    def close(self):
+        with self._lock:
+            self.flush()
+            self._connection.close()
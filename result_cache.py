@@ -0,0 +1,182 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+DEFAULT_CACHE_FILE = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "result_cache.sqlite"
+)
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+
+def image_hash(data):
+    """Return the SHA-256 hex digest of image bytes or of the file at a path"""
+    if isinstance(data, (bytes, bytearray, memoryview)):
+        return hashlib.sha256(data).hexdigest()
+    digest = hashlib.sha256()
+    with open(data, "rb") as file:
+        for chunk in iter(lambda: file.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ResultCache:
+    """
+    Persistent cache of analysis results keyed by image content.
+
+    Entries are keyed by the SHA-256 of the image bytes plus a version string
+    that should change whenever the models or settings that produced the
+    results change. When the stored results grow past `max_bytes` the least
+    recently used entries are evicted.
+
+    Writes are batched: hits only note their new use time in memory, and
+    stores are committed every `commit_every` writes or `commit_seconds`
+    seconds, whichever comes first, so a re-run over cached images does not
+    pay for a disk sync per image. Call `flush` (or `close`) at the end of a
+    run so the last batch is kept.
+
+    Args:
+        path (str): SQLite file to store the cache in.
+        version (str): Model/config version the cached results belong to.
+        max_bytes (int): Upper bound on the total size of stored results.
+        commit_every (int): Pending writes that trigger a commit.
+        commit_seconds (float): Longest time a write stays uncommitted.
+    """
+
+    def __init__(
+        self,
+        path=DEFAULT_CACHE_FILE,
+        version="1",
+        max_bytes=DEFAULT_MAX_BYTES,
+        commit_every=256,
+        commit_seconds=5.0,
+    ):
+        self.path = path
+        self.version = version
+        self.max_bytes = max_bytes
+        self.commit_every = commit_every
+        self.commit_seconds = commit_seconds
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        # key -> last use time of hits not yet written back
+        self._touched = {}
+        self._pending = 0
+        self._committed_at = time.monotonic()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        # A crash may lose the last uncommitted batch, never corrupt the file
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS results ("
+            "key TEXT PRIMARY KEY, data TEXT NOT NULL, "
+            "size INTEGER NOT NULL, last_used REAL NOT NULL)"
+        )
+        self._connection.execute(
+            "CREATE INDEX IF NOT EXISTS results_last_used ON results (last_used)"
+        )
+        self._connection.commit()
+        self._total_bytes = self._connection.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM results"
+        ).fetchone()[0]
+
+    def _key(self, digest):
+        return f"{digest}:{self.version}"
+
+    def get(self, digest):
+        """Return the cached result dict for an image hash, or None"""
+        key = self._key(digest)
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT data FROM results WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._touched[key] = time.time()
+            self._pending += 1
+            self._commit_if_due()
+        return json.loads(row[0])
+
+    def put(self, digest, result):
+        """Store the result dict for an image hash"""
+        key = self._key(digest)
+        data = json.dumps(result, ensure_ascii=False)
+        size = len(data.encode("utf-8"))
+        with self._lock:
+            previous = self._connection.execute(
+                "SELECT size FROM results WHERE key = ?", (key,)
+            ).fetchone()
+            self._connection.execute(
+                "INSERT OR REPLACE INTO results (key, data, size, last_used) "
+                "VALUES (?, ?, ?, ?)",
+                (key, data, size, time.time()),
+            )
+            self._total_bytes += size - (previous[0] if previous else 0)
+            self._touched.pop(key, None)
+            self._pending += 1
+            if self._total_bytes > self.max_bytes:
+                self._evict()
+            self._commit_if_due()
+
+    def _write_touched(self):
+        if self._touched:
+            self._connection.executemany(
+                "UPDATE results SET last_used = ? WHERE key = ?",
+                [(used, key) for key, used in self._touched.items()],
+            )
+            self._touched.clear()
+
+    def _commit_locked(self):
+        self._write_touched()
+        self._connection.commit()
+        self._pending = 0
+        self._committed_at = time.monotonic()
+
+    def _commit_if_due(self):
+        if self._pending >= self.commit_every or (
+            self._pending
+            and time.monotonic() - self._committed_at >= self.commit_seconds
+        ):
+            self._commit_locked()
+
+    def flush(self):
+        """Write pending use times and stores to disk"""
+        with self._lock:
+            self._commit_locked()
+
+    def _evict(self):
+        # Eviction order must see the use times still held in memory
+        self._write_touched()
+        while self._total_bytes > self.max_bytes:
+            oldest = self._connection.execute(
+                "SELECT key, size FROM results ORDER BY last_used LIMIT 64"
+            ).fetchall()
+            if not oldest:
+                break
+            for key, size in oldest:
+                if self._total_bytes <= self.max_bytes:
+                    break
+                self._connection.execute("DELETE FROM results WHERE key = ?", (key,))
+                self._total_bytes -= size
+                self.evictions += 1
+
+    def stats(self):
+        """Return hit/miss counters and the current size of the cache"""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "bytes": self._total_bytes,
+        }
+
+    def close(self):
+        with self._lock:
+            self._commit_locked()
+            self._connection.close()
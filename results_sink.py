@@ -0,0 +1,264 @@
+import glob
+import heapq
+import itertools
+import json
+import os
+import threading
+import time
+
+from openpyxl import Workbook, load_workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Alignment
+from openpyxl.utils import get_column_letter
+
+SHEET_TITLE = "Sentiment Analysis Results"
+WIDTHS_FILE = "widths.json"
+# Field of a part-file line holding the row's key; never a workbook column
+KEY_FIELD = "_key"
+# Part files already sorted by `sort_by` end in this
+SORTED_SUFFIX = ".sorted.jsonl"
+
+
+class ResultsSink:
+    """
+    Write-only results store that grows one row at a time.
+
+    Rows are appended to a JSON Lines part file as images finish, so nothing
+    already written has to be reloaded. Each run gets its own part file next
+    to the workbook (in `<workbook>.parts/`). Column widths are tracked as
+    running maxima while rows arrive. `close()` sorts the run's part file by
+    `sort_by` (an external merge sort, `sort_chunk` rows in memory at a time)
+    and then builds the `.xlsx` from all part files in one streaming pass
+    with openpyxl's write-only mode. Part files left unsorted by a crashed
+    run are sorted the same way before the workbook is built.
+
+    An existing workbook without a parts folder is imported into a first part
+    file once, through a read-only streaming pass.
+
+    Rows appended with a `key` (the image path) are written to the workbook
+    once: when a resumed run redoes an image whose row reached disk but was
+    not yet journaled, the row from the newest part file wins. Finding the
+    newest row holds every key (not row) in memory. A line cut off by a
+    crash at the end of a part file is skipped.
+
+    Args:
+        excel_file (str): Path of the workbook to produce.
+        columns (list): Column order; taken from the first row if not given.
+        flush_every (int): Rows between flushes of the part file to disk.
+        sort_by (str): Column each run's rows are sorted by in the workbook.
+        sort_chunk (int): Rows held in memory at a time while sorting.
+    """
+
+    def __init__(
+        self,
+        excel_file,
+        columns=None,
+        flush_every=50,
+        sort_by="File Name",
+        sort_chunk=10000,
+    ):
+        self.excel_file = excel_file
+        self.parts_folder = excel_file + ".parts"
+        self.columns = list(columns) if columns is not None else None
+        self.flush_every = flush_every
+        self.sort_by = sort_by
+        self.sort_chunk = sort_chunk
+        self.rows_written = 0
+        self._lock = threading.RLock()
+        self._pending = 0
+
+        os.makedirs(self.parts_folder, exist_ok=True)
+        self._widths = self._load_widths()
+        if os.path.exists(excel_file) and not self._part_files():
+            self._import_workbook()
+
+        part_name = f"part-{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}.jsonl"
+        self.part_file = os.path.join(self.parts_folder, part_name)
+        self._file = open(self.part_file, "a", encoding="utf-8")
+
+    def _part_files(self):
+        return sorted(glob.glob(os.path.join(self.parts_folder, "part-*.jsonl")))
+
+    def _load_widths(self):
+        path = os.path.join(self.parts_folder, WIDTHS_FILE)
+        if not os.path.exists(path):
+            return {}
+        with open(path, encoding="utf-8") as file:
+            saved = json.load(file)
+        if self.columns is None:
+            self.columns = saved.get("columns")
+        return saved.get("widths", {})
+
+    def _save_widths(self):
+        path = os.path.join(self.parts_folder, WIDTHS_FILE)
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump({"columns": self.columns, "widths": self._widths}, file)
+
+    def _track(self, row):
+        if self.columns is None:
+            self.columns = list(row)
+        # Columns added after the workbook was started go on the right
+        self.columns.extend([column for column in row if column not in self.columns])
+        for column in self.columns:
+            if column not in self._widths:
+                self._widths[column] = len(str(column))
+            value = row.get(column)
+            if value:
+                self._widths[column] = max(self._widths[column], len(str(value)))
+
+    def _import_workbook(self):
+        print(f"Importing existing rows from {self.excel_file}")
+        workbook = load_workbook(self.excel_file, read_only=True)
+        sheet = workbook.active
+        rows = sheet.iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is not None:
+            if self.columns is None:
+                self.columns = [str(column) for column in header]
+            legacy = os.path.join(self.parts_folder, "part-00000000-legacy.jsonl")
+            with open(legacy, "w", encoding="utf-8") as file:
+                for values in rows:
+                    row = dict(zip(self.columns, values))
+                    self._track(row)
+                    file.write(json.dumps(row, ensure_ascii=False, default=str))
+                    file.write("\n")
+            if self.sort_by:
+                self._sort_part(legacy)
+        workbook.close()
+        self._save_widths()
+
+    def append(self, row, key=None):
+        """Append one result row; safe to call from several threads"""
+        stored = row if key is None else dict(row, **{KEY_FIELD: key})
+        line = json.dumps(stored, ensure_ascii=False, default=str)
+        with self._lock:
+            self._track(row)
+            self._file.write(line + "\n")
+            self.rows_written += 1
+            self._pending += 1
+            if self._pending >= self.flush_every:
+                self.flush()
+
+    def flush(self):
+        """Push buffered rows to disk so a crash loses at most `flush_every` rows"""
+        with self._lock:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._save_widths()
+            self._pending = 0
+
+    def _read_part(self, part_file, report=True):
+        """Yield the rows of a part file one at a time"""
+        with open(part_file, encoding="utf-8") as file:
+            for line in file:
+                if not line.strip():
+                    continue
+                try:
+                    row = json.loads(line)
+                except json.JSONDecodeError:
+                    if line.endswith("\n"):
+                        raise
+                    # The last line was cut off by a crash mid-write
+                    if report:
+                        print(f"Skipping a partial last row in {part_file}")
+                    continue
+                yield row
+
+    def _sort_key(self, row):
+        return str(row.get(self.sort_by) or "")
+
+    def _write_rows(self, path, rows):
+        with open(path, "w", encoding="utf-8") as file:
+            for row in rows:
+                file.write(json.dumps(row, ensure_ascii=False, default=str))
+                file.write("\n")
+
+    def _sort_part(self, part_file):
+        """
+        Sort a part file by `sort_by` into its `.sorted.jsonl` counterpart.
+
+        Chunks of `sort_chunk` rows are sorted in memory and written out, then
+        merged lazily, so a run (or an imported workbook) of any size is
+        sorted without holding it in memory. Rows of one run are sorted like
+        the old workbook batches were.
+        """
+        sorted_file = part_file[: -len(".jsonl")] + SORTED_SUFFIX
+        rows = self._read_part(part_file)
+        chunk_files = []
+        try:
+            while True:
+                chunk = list(itertools.islice(rows, self.sort_chunk))
+                if not chunk:
+                    break
+                chunk.sort(key=self._sort_key)
+                chunk_file = f"{part_file}.chunk{len(chunk_files)}"
+                self._write_rows(chunk_file, chunk)
+                chunk_files.append(chunk_file)
+            # Both the sort and the merge are stable, so ties keep their order
+            merged = heapq.merge(
+                *(self._read_part(path) for path in chunk_files), key=self._sort_key
+            )
+            self._write_rows(sorted_file + ".tmp", merged)
+            os.replace(sorted_file + ".tmp", sorted_file)
+            os.remove(part_file)
+        finally:
+            for chunk_file in chunk_files:
+                os.remove(chunk_file)
+
+    def _iter_rows(self):
+        if self.sort_by:
+            for part_file in self._part_files():
+                if not part_file.endswith(SORTED_SUFFIX):
+                    self._sort_part(part_file)
+        part_files = self._part_files()
+        # Key -> index of the newest part file holding a row for it
+        newest = {}
+        if len(part_files) > 1:
+            for index, part_file in enumerate(part_files):
+                for row in self._read_part(part_file, report=False):
+                    if KEY_FIELD in row:
+                        newest[row[KEY_FIELD]] = index
+        for index, part_file in enumerate(part_files):
+            for row in self._read_part(part_file):
+                if newest.get(row.get(KEY_FIELD), index) == index:
+                    yield row
+
+    def write_workbook(self):
+        """Build the .xlsx from every part file in one streaming pass"""
+        workbook = Workbook(write_only=True)
+        sheet = workbook.create_sheet(SHEET_TITLE)
+        alignment = Alignment(wrap_text=True, vertical="top")
+        columns = self.columns or []
+        for index, column in enumerate(columns, start=1):
+            width = self._widths.get(column, len(str(column))) + 2
+            sheet.column_dimensions[get_column_letter(index)].width = width
+
+        def styled(value):
+            cell = WriteOnlyCell(sheet, value=value)
+            cell.alignment = alignment
+            return cell
+
+        sheet.append([styled(column) for column in columns])
+        for row in self._iter_rows():
+            sheet.append([styled(row.get(column)) for column in columns])
+
+        temporary_file = self.excel_file + ".tmp"
+        workbook.save(temporary_file)
+        while True:
+            try:
+                os.replace(temporary_file, self.excel_file)
+                break
+            except PermissionError:
+                input(
+                    f"Please close the file '{self.excel_file}' and press Enter to continue..."
+                )
+        print(f"Results saved to {self.excel_file}")
+
+    def close(self):
+        """Flush the current part file and write the final workbook"""
+        self.flush()
+        with self._lock:
+            self._file.close()
+        if self.rows_written == 0 and os.path.getsize(self.part_file) == 0:
+            os.remove(self.part_file)
+        self.write_workbook()
@@ -0,0 +1,99 @@
+"""
+Batch VADER scoring for whole result sets.
+
+Rescore an existing results workbook:
+    python sentiment_batch.py Results/RQ1_and_RQ2/Sentiment_Analysis_Results.xlsx rescored.xlsx
+"""
+
+import argparse
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+
+SCORE_COLUMNS = ["neg", "neu", "pos", "compound"]
+
+analyzer = SentimentIntensityAnalyzer()
+
+
+@lru_cache(maxsize=200_000)
+def polarity_scores(text):
+    """VADER scores for one text as a (neg, neu, pos, compound) tuple, memoized"""
+    scores = analyzer.polarity_scores(text)
+    return scores["neg"], scores["neu"], scores["pos"], scores["compound"]
+
+
+def score_texts(texts):
+    """
+    Score a list or Series of texts with VADER.
+
+    Each distinct text is scored once, so repeated meme text and captions cost
+    a dictionary lookup. Missing values score as empty text.
+
+    Returns:
+        pandas.DataFrame: neg/neu/pos/compound columns, one row per text, with
+        the Series index when a Series is passed in.
+    """
+    series = (
+        pd.Series(texts, dtype="object") if not isinstance(texts, pd.Series) else texts
+    )
+    series = series.fillna("").astype(str)
+    codes, uniques = pd.factorize(series, sort=False)
+    unique_scores = np.array(
+        [polarity_scores(text) for text in uniques], dtype=float
+    ).reshape(-1, len(SCORE_COLUMNS))
+    return pd.DataFrame(unique_scores[codes], columns=SCORE_COLUMNS, index=series.index)
+
+
+def sentiment_labels(compound):
+    """Map compound scores to Positive/Negative/Neutral labels"""
+    compound = np.asarray(compound, dtype=float)
+    return np.select(
+        [compound >= 0.05, compound <= -0.05], ["Positive", "Negative"], "Neutral"
+    )
+
+
+def confidence_levels(overall_score):
+    """Vectorized version of calculate_confidence; returns percentages"""
+    confidence = np.abs(np.asarray(overall_score, dtype=float)) * 100
+    confidence = np.where(
+        confidence < 50, 50 + confidence * 0.5, 50 + confidence**1.8 / 20
+    )
+    return np.round(np.minimum(confidence, 100), 2)
+
+
+def score_results(df, text_column="Translated Text", caption_column="Image Caption"):
+    """
+    Recompute every sentiment column of a results DataFrame in one pass.
+
+    Adds or overwrites Text Sentiment, Caption Sentiment, Overall Sentiment and
+    Confidence, plus the compound score columns, and returns the DataFrame.
+    """
+    text_scores = score_texts(df[text_column])
+    caption_scores = score_texts(df[caption_column])
+    overall = text_scores["compound"].to_numpy() + caption_scores["compound"].to_numpy()
+
+    df["Text Sentiment"] = sentiment_labels(text_scores["compound"])
+    df["Caption Sentiment"] = sentiment_labels(caption_scores["compound"])
+    df["Overall Sentiment"] = sentiment_labels(overall)
+    # calculate_confidence returns the int 100 when capped, so match its format
+    df["Confidence"] = [
+        f"{level}%" if level < 100 else "100%"
+        for level in confidence_levels(overall).tolist()
+    ]
+    df["Translated Text Compound Score"] = text_scores["compound"].to_numpy()
+    df["Caption Compound Score"] = caption_scores["compound"].to_numpy()
+    df["Overall Compound Score"] = overall
+    return df
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rescore a results workbook")
+    parser.add_argument("input_excel")
+    parser.add_argument("output_excel")
+    args = parser.parse_args()
+
+    results = pd.read_excel(args.input_excel)
+    score_results(results).to_excel(args.output_excel, index=False)
+    print(f"Rescored {len(results)} row(s); saved to {args.output_excel}")
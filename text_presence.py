@@ -0,0 +1,98 @@
+import threading
+
+import numpy as np
+from PIL import Image
+
+
+class TextPresenceDetector:
+    """
+    Cheap check for whether an image has any text worth running OCR on.
+
+    Meme text is drawn in high-contrast strokes, so it shows up as tiles
+    dense in both horizontal and vertical edges, lined up along a row. The
+    image is shrunk to `max_side`, cut into `tile`-pixel squares, and the
+    longest run of such tiles in any row of tiles is its score. Images whose
+    score is below `min_run` are treated as text-free.
+
+    The thresholds lean towards recall: a photo mistaken for text only costs
+    the OCR pass that would have run anyway, while a missed caption loses
+    its text from the results.
+
+    Args:
+        max_side (int): Long side of the image the edges are measured on.
+        tile (int): Side of the square tiles, in pixels of the shrunk image.
+        edge_threshold (int): Smallest gray-level step counted as an edge.
+        min_density (float): Share of edge pixels, in each direction, a tile
+            needs to look like text.
+        max_density (float): Tiles busier than this are texture, not text.
+        min_run (int): Adjacent text-like tiles in a row needed to call OCR.
+    """
+
+    def __init__(
+        self,
+        max_side=512,
+        tile=16,
+        edge_threshold=60,
+        min_density=0.04,
+        max_density=0.6,
+        min_run=2,
+    ):
+        self.max_side = max_side
+        self.tile = tile
+        self.edge_threshold = edge_threshold
+        self.min_density = min_density
+        self.max_density = max_density
+        self.min_run = min_run
+        self.checked = 0
+        self.skipped = 0
+        self._lock = threading.Lock()
+
+    def _gray(self, image):
+        if isinstance(image, np.ndarray):
+            image = Image.fromarray(image)
+        image = image.convert("L")
+        scale = self.max_side / max(image.size)
+        if scale < 1:
+            size = (
+                max(1, round(image.size[0] * scale)),
+                max(1, round(image.size[1] * scale)),
+            )
+            image = image.resize(size, Image.BILINEAR)
+        return np.asarray(image, dtype=np.int16)
+
+    def score(self, image):
+        """Longest row of text-like tiles in an RGB array or PIL image"""
+        gray = self._gray(image)
+        tile = self.tile
+        rows, columns = (gray.shape[0] - 1) // tile, (gray.shape[1] - 1) // tile
+        if rows == 0 or columns == 0:
+            return 0
+        height, width = rows * tile, columns * tile
+        edges_x = np.abs(np.diff(gray, axis=1))[:height, :width] > self.edge_threshold
+        edges_y = np.abs(np.diff(gray, axis=0))[:height, :width] > self.edge_threshold
+        density_x = edges_x.reshape(rows, tile, columns, tile).mean(axis=(1, 3))
+        density_y = edges_y.reshape(rows, tile, columns, tile).mean(axis=(1, 3))
+        text_like = (
+            (density_x >= self.min_density)
+            & (density_y >= self.min_density)
+            & (density_x + density_y <= self.max_density)
+        )
+        longest = 0
+        for row in text_like:
+            run = 0
+            for cell in row:
+                run = run + 1 if cell else 0
+                longest = max(longest, run)
+        return longest
+
+    def has_text(self, image):
+        """True when the image may contain text and should go through OCR"""
+        found = self.score(image) >= self.min_run
+        with self._lock:
+            self.checked += 1
+            self.skipped += not found
+        return found
+
+    def stats(self):
+        """How many images were checked and how many skipped OCR"""
+        return {"checked": self.checked, "skipped": self.skipped}
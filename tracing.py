@@ -0,0 +1,147 @@
+import contextlib
+import json
+import math
+import os
+import random
+import threading
+import time
+
+
+def percentile(sorted_values, p):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return None
+    rank = max(1, math.ceil(p / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+class Tracer:
+    """
+    Records timed spans per image and stage while a run is in progress.
+
+    With `keep_spans`, every span is kept in memory (one small tuple each)
+    and can be exported as Chrome trace-event JSON, which chrome://tracing
+    and Perfetto open as a timeline with one row per worker thread. Without
+    it only a count, a total and a bounded random sample of durations are
+    kept per span name, so memory stays flat however many images a run
+    covers. `summary()` gives p50/p95/p99 latencies per span name, from the
+    sample once a name has more spans than `sample_size`.
+
+    Span names ending in " wait" are time an item sat in a queue before a
+    stage picked it up; the other names are time spent inside a stage.
+
+    Args:
+        keep_spans (bool): Keep every span for `export_chrome`.
+        sample_size (int): Durations kept per span name for the percentiles.
+    """
+
+    def __init__(self, keep_spans=False, sample_size=4096):
+        self.keep_spans = keep_spans
+        self.sample_size = sample_size
+        self._origin = time.perf_counter()
+        self._spans = []
+        self._stats = {}
+        self._threads = {}
+        self._random = random.Random(0)
+        self._lock = threading.Lock()
+
+    def now(self):
+        return time.perf_counter()
+
+    def add(self, name, start, end, item=None, category="stage"):
+        """Record a span between two `now()` timestamps"""
+        duration = 1000 * (end - start)
+        thread = threading.current_thread()
+        with self._lock:
+            stats = self._stats.setdefault(
+                name, {"count": 0, "total": 0.0, "sample": []}
+            )
+            stats["count"] += 1
+            stats["total"] += duration
+            # Reservoir sampling: every span so far is equally likely to be kept
+            if len(stats["sample"]) < self.sample_size:
+                stats["sample"].append(duration)
+            else:
+                slot = self._random.randrange(stats["count"])
+                if slot < self.sample_size:
+                    stats["sample"][slot] = duration
+            if self.keep_spans:
+                self._threads.setdefault(thread.ident, thread.name)
+                self._spans.append((name, category, start, end, item, thread.ident))
+
+    @contextlib.contextmanager
+    def span(self, name, item=None, category="stage"):
+        """Time the body of a `with` block as one span"""
+        start = self.now()
+        try:
+            yield
+        finally:
+            self.add(name, start, self.now(), item, category)
+
+    def summary(self):
+        """Per span name: count, total and p50/p95/p99 in milliseconds"""
+        with self._lock:
+            stats = {
+                name: (entry["count"], entry["total"], sorted(entry["sample"]))
+                for name, entry in self._stats.items()
+            }
+        rows = {}
+        for name, (count, total, values) in stats.items():
+            rows[name] = {
+                "count": count,
+                "total_ms": round(total, 1),
+                "p50_ms": round(percentile(values, 50), 2),
+                "p95_ms": round(percentile(values, 95), 2),
+                "p99_ms": round(percentile(values, 99), 2),
+            }
+        return rows
+
+    def print_summary(self):
+        rows = self.summary()
+        if not rows:
+            return
+        print(
+            f"{'span':<16} {'count':>7} {'p50 ms':>9} {'p95 ms':>9} "
+            f"{'p99 ms':>9} {'total s':>9}"
+        )
+        for name, row in rows.items():
+            print(
+                f"{name:<16} {row['count']:>7} {row['p50_ms']:>9.2f} "
+                f"{row['p95_ms']:>9.2f} {row['p99_ms']:>9.2f} "
+                f"{row['total_ms'] / 1000:>9.2f}"
+            )
+
+    def export_chrome(self, path):
+        """Write the spans as Chrome trace-event JSON"""
+        if not self.keep_spans:
+            raise ValueError("Chrome traces need a Tracer(keep_spans=True)")
+        pid = os.getpid()
+        with self._lock:
+            spans = list(self._spans)
+            threads = dict(self._threads)
+        events = [
+            {
+                "name": "thread_name",
+                "ph": "M",
+                "pid": pid,
+                "tid": tid,
+                "args": {"name": name},
+            }
+            for tid, name in threads.items()
+        ]
+        for name, category, start, end, item, tid in spans:
+            event = {
+                "name": name,
+                "cat": category,
+                "ph": "X",
+                "ts": round((start - self._origin) * 1e6, 1),
+                "dur": round((end - start) * 1e6, 1),
+                "pid": pid,
+                "tid": tid,
+            }
+            if item is not None:
+                event["args"] = {"item": item}
+            events.append(event)
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, file)
+        print(f"Trace saved to {path}")
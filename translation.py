@@ -0,0 +1,421 @@
+import os
+import re
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import language_id
+import model_registry
+
+DEFAULT_CACHE_FILE = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "translation_cache.sqlite"
+)
+
+
+def split_sentences(text):
+    """Split text into sentences on end punctuation and line breaks"""
+    return [
+        sentence.strip()
+        for sentence in re.split(r"(?<=[.!?])\s+|\n+", text)
+        if sentence.strip()
+    ]
+
+
+def normalize_text(text):
+    """Collapse whitespace and case so repeated meme text shares a cache entry"""
+    return " ".join(text.split()).casefold()
+
+
+class TranslationBackend:
+    """Interface for anything that can translate a list of strings"""
+
+    name = "base"
+
+    def translate_batch(self, texts, target_language="en"):
+        """Return the translations of `texts`, in the same order"""
+        raise NotImplementedError
+
+
+class GoogleTranslateBackend(TranslationBackend):
+    """Translates through the Google Translate web endpoint via googletrans"""
+
+    name = "google"
+
+    def __init__(self):
+        # googletrans clients are not safe to share between threads
+        self._local = threading.local()
+
+    def _translator(self):
+        translator = getattr(self._local, "translator", None)
+        if translator is None:
+            from googletrans import Translator
+
+            translator = self._local.translator = Translator()
+        return translator
+
+    def translate_batch(self, texts, target_language="en"):
+        translated = self._translator().translate(list(texts), dest=target_language)
+        return [item.text for item in translated]
+
+
+# A few common Tagalog words so the offline stand-in produces English-looking text
+TAGALOG_GLOSSARY = {
+    "ako": "I",
+    "ikaw": "you",
+    "ka": "you",
+    "siya": "he/she",
+    "kami": "we",
+    "tayo": "we",
+    "sila": "they",
+    "hindi": "not",
+    "oo": "yes",
+    "wala": "none",
+    "may": "there is",
+    "mahal": "love",
+    "masaya": "happy",
+    "malungkot": "sad",
+    "galit": "angry",
+    "pangit": "ugly",
+    "maganda": "beautiful",
+    "salamat": "thank you",
+    "bakit": "why",
+    "ano": "what",
+    "sino": "who",
+    "lahat": "all",
+    "bayan": "country",
+    "pera": "money",
+    "trabaho": "work",
+    "gutom": "hungry",
+    "mabuhay": "long live",
+    "nakakatawa": "funny",
+    "kasi": "because",
+    "talaga": "really",
+}
+
+
+class OfflineBackend(TranslationBackend):
+    """
+    Local stand-in backend that needs no network access.
+
+    Words found in the glossary are replaced and everything else is kept as
+    is. `delay` adds an artificial per-call latency so benchmarks can mimic a
+    remote service.
+    """
+
+    name = "offline"
+
+    def __init__(self, glossary=None, delay=0.0):
+        self.glossary = TAGALOG_GLOSSARY if glossary is None else glossary
+        self.delay = delay
+
+    def _translate(self, text):
+        return re.sub(
+            r"[^\W\d_]+",
+            lambda match: self.glossary.get(match.group(0).lower(), match.group(0)),
+            text,
+        )
+
+    def translate_batch(self, texts, target_language="en"):
+        if self.delay:
+            time.sleep(self.delay)
+        return [self._translate(text) for text in texts]
+
+
+class MarianBackend(TranslationBackend):
+    """
+    Offline neural Tagalog to English translation with a local Marian model.
+
+    Texts are split into sentences and all sentences of a call are run through
+    the model in batches of `batch_size`, then joined back per text. The model
+    is loaded once per process through the model registry; `model_path` can
+    be a local directory (e.g. a saved copy of Helsinki-NLP/opus-mt-tl-en) so
+    no network access is needed at run time.
+
+    Args:
+        model_path (str): Local directory or hub name of the Marian model.
+        device (str): Torch device to run on.
+        batch_size (int): Sentences per `generate` call.
+        num_beams (int): Beam width; 1 is greedy decoding, the fastest on CPU.
+        max_length (int): Longest translation generated per sentence, in tokens.
+    """
+
+    name = "marian"
+
+    def __init__(
+        self,
+        model_path=model_registry.MARIAN_MODEL_NAME,
+        device="cpu",
+        batch_size=16,
+        num_beams=1,
+        max_length=128,
+    ):
+        self.model_path = model_path
+        self.device = device
+        self.batch_size = batch_size
+        self.num_beams = num_beams
+        self.max_length = max_length
+
+    def _generate(self, sentences):
+        import torch
+
+        with model_registry.get_marian(self.model_path, self.device) as (
+            tokenizer,
+            model,
+        ):
+            inputs = tokenizer(
+                sentences, return_tensors="pt", padding=True, truncation=True
+            ).to(self.device)
+            with torch.no_grad():
+                out = model.generate(
+                    **inputs, num_beams=self.num_beams, max_length=self.max_length
+                )
+            return tokenizer.batch_decode(out, skip_special_tokens=True)
+
+    def translate_batch(self, texts, target_language="en"):
+        if target_language != "en":
+            raise ValueError("The Marian backend only translates into English")
+        sentences = []
+        owners = []
+        for index, text in enumerate(texts):
+            for sentence in split_sentences(text):
+                sentences.append(sentence)
+                owners.append(index)
+
+        # Sorting by length keeps padding inside each batch small
+        order = sorted(range(len(sentences)), key=lambda i: len(sentences[i]))
+        translated = [""] * len(sentences)
+        for start in range(0, len(order), self.batch_size):
+            batch = order[start : start + self.batch_size]
+            outputs = self._generate([sentences[i] for i in batch])
+            for i, output in zip(batch, outputs):
+                translated[i] = output
+
+        joined = [[] for _ in texts]
+        for owner, output in zip(owners, translated):
+            joined[owner].append(output)
+        return [" ".join(parts) for parts in joined]
+
+
+BACKENDS = {
+    "google": GoogleTranslateBackend,
+    "offline": OfflineBackend,
+    "marian": MarianBackend,
+}
+
+
+def get_backend(name, **kwargs):
+    """Build a registered translation backend by name"""
+    if name not in BACKENDS:
+        raise ValueError(
+            f"Unknown translation backend '{name}'. Choose from: {', '.join(BACKENDS)}"
+        )
+    return BACKENDS[name](**kwargs)
+
+
+class TranslationService:
+    """
+    Cached, batched front end for a translation backend.
+
+    Texts are normalized before lookup, so the same meme text seen with
+    different spacing or casing is only translated once. Cache entries are
+    kept in memory and, when `cache_path` is set, in SQLite across runs.
+    Misses are sent to the backend in chunks of `max_batch_size`, with at
+    most `max_concurrency` backend calls in flight across all callers.
+
+    Args:
+        backend (TranslationBackend): Where cache misses are translated.
+        cache_path (str): SQLite file for the persistent cache, or None.
+        max_batch_size (int): Most strings sent in one backend call.
+        max_concurrency (int): Most backend calls running at the same time.
+    """
+
+    def __init__(
+        self,
+        backend,
+        cache_path=DEFAULT_CACHE_FILE,
+        max_batch_size=32,
+        max_concurrency=4,
+    ):
+        self.backend = backend
+        self.max_batch_size = max_batch_size
+        self.max_concurrency = max_concurrency
+        self.requests = 0
+        self.cache_hits = 0
+        self.backend_calls = 0
+        self.characters_sent = 0
+        self.failures = 0
+        self.sentences_seen = 0
+        self.sentences_skipped = 0
+        self._memory = {}
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        # Per calling thread: whether its latest call fell back to the original
+        self._local = threading.local()
+        self._connection = None
+        if cache_path:
+            self._connection = sqlite3.connect(cache_path, check_same_thread=False)
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS translations ("
+                "backend TEXT NOT NULL, target TEXT NOT NULL, key TEXT NOT NULL, "
+                "translation TEXT NOT NULL, PRIMARY KEY (backend, target, key))"
+            )
+            self._connection.commit()
+
+    def _lookup(self, key, target_language):
+        memory_key = (target_language, key)
+        if memory_key in self._memory:
+            return self._memory[memory_key]
+        if self._connection is None:
+            return None
+        row = self._connection.execute(
+            "SELECT translation FROM translations "
+            "WHERE backend = ? AND target = ? AND key = ?",
+            (self.backend.name, target_language, key),
+        ).fetchone()
+        if row is not None:
+            self._memory[memory_key] = row[0]
+            return row[0]
+        return None
+
+    def _store(self, pairs, target_language):
+        for key, translation in pairs:
+            self._memory[(target_language, key)] = translation
+        if self._connection is not None:
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO translations "
+                "(backend, target, key, translation) VALUES (?, ?, ?, ?)",
+                [
+                    (self.backend.name, target_language, key, translation)
+                    for key, translation in pairs
+                ],
+            )
+            self._connection.commit()
+
+    def _translate_chunk(self, texts, target_language):
+        with self._slots:
+            with self._lock:
+                self.backend_calls += 1
+                self.characters_sent += sum(len(text) for text in texts)
+            return self.backend.translate_batch(texts, target_language)
+
+    def _attempt(self, chunk, misses, target_language):
+        try:
+            return self._translate_chunk(
+                [misses[key] for key in chunk], target_language
+            )
+        except Exception as e:
+            print(f"Error during translation: {e}")
+            with self._lock:
+                self.failures += len(chunk)
+            return None
+
+    def translate_batch(self, texts, target_language="en"):
+        """Translate many strings, going to the backend only for cache misses"""
+        self._local.failed = False
+        texts = list(texts)
+        keys = [normalize_text(text) for text in texts]
+        translations = {}
+        misses = {}
+        with self._lock:
+            self.requests += len(texts)
+            for text, key in zip(texts, keys):
+                if not key or key in translations or key in misses:
+                    continue
+                cached = self._lookup(key, target_language)
+                if cached is None:
+                    misses[key] = text
+                else:
+                    translations[key] = cached
+                    self.cache_hits += 1
+
+        miss_keys = list(misses)
+        chunks = [
+            miss_keys[i : i + self.max_batch_size]
+            for i in range(0, len(miss_keys), self.max_batch_size)
+        ]
+        if len(chunks) == 1:
+            # A single chunk is sent from the calling thread
+            outcomes = [self._attempt(chunks[0], misses, target_language)]
+        elif chunks:
+            with ThreadPoolExecutor(max_workers=self.max_concurrency) as executor:
+                outcomes = list(
+                    executor.map(
+                        lambda chunk: self._attempt(chunk, misses, target_language),
+                        chunks,
+                    )
+                )
+        else:
+            outcomes = []
+
+        for chunk, translated in zip(chunks, outcomes):
+            if translated is None:
+                # Fall back to the original text and do not cache it
+                self._local.failed = True
+                for key in chunk:
+                    translations[key] = misses[key]
+                continue
+            pairs = list(zip(chunk, translated))
+            translations.update(pairs)
+            with self._lock:
+                self._store(pairs, target_language)
+
+        return [
+            translations.get(key, text) if key else "" for text, key in zip(texts, keys)
+        ]
+
+    def translate(self, text, target_language="en"):
+        """Translate a single string"""
+        self._local.failed = False
+        if not text.strip():
+            return ""
+        return self.translate_batch([text], target_language)[0]
+
+    def translate_mixed(self, text, target_language="en"):
+        """
+        Translate only the sentences of `text` that are not already English.
+
+        English sentences are kept as they are and counted in
+        `sentences_skipped`, so mostly-English memes never reach the backend.
+        """
+        self._local.failed = False
+        if not text.strip():
+            return ""
+        sentences = split_sentences(text)
+        foreign = [
+            index
+            for index, sentence in enumerate(sentences)
+            if not language_id.is_english(sentence)
+        ]
+        with self._lock:
+            self.sentences_seen += len(sentences)
+            self.sentences_skipped += len(sentences) - len(foreign)
+        if not foreign:
+            return text
+        translated = self.translate_batch(
+            [sentences[index] for index in foreign], target_language
+        )
+        for index, translation in zip(foreign, translated):
+            sentences[index] = translation
+        return " ".join(sentences)
+
+    def last_failed(self):
+        """True if the calling thread's latest translation kept untranslated text"""
+        return getattr(self._local, "failed", False)
+
+    def stats(self):
+        """Return request, cache and backend counters"""
+        return {
+            "requests": self.requests,
+            "cache_hits": self.cache_hits,
+            "backend_calls": self.backend_calls,
+            "characters_sent": self.characters_sent,
+            "failures": self.failures,
+            "sentences_seen": self.sentences_seen,
+            "sentences_skipped": self.sentences_skipped,
+        }
+
+    def close(self):
+        if self._connection is not None:
+            with self._lock:
+                self._connection.close()